@@ -0,0 +1,318 @@
+"""A local stand-in for the Smartsheet REST API, used by the benchmarks.
+
+Only the endpoints this project calls are implemented, and sheets are kept in memory. Every request can be slowed
+down by a fixed latency, and a share of the requests can be answered with HTTP 429 to exercise the rate limit
+handling.
+
+Run it on its own with:
+
+    python -m benchmarks.fake_smartsheet_server --port 8765 --latency 0.05 --throttle 0.02
+"""
+
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+# - The columns of the template sheet new sheets are created from
+TEMPLATE_COLUMNS = ["ITEM#", "ITEM DESCRIPTION", "QTY", "UOM", "AREA", "NOTES", "AWARDED TO"]
+
+
+def error(code, message):
+    """Builds the JSON of an error response, with the fields the Smartsheet SDK reads from every error."""
+    return {"errorCode": code, "message": message, "refId": uuid.uuid4().hex[:13]}
+
+
+def now():
+    """Returns the current time in the ISO 8601 format Smartsheet uses."""
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds")
+
+
+class FakeSmartsheet:
+    """The in-memory workspaces and sheets served by the fake server.
+
+    Args:
+        latency (float, optional): The number of seconds every request is delayed by.
+        throttle (float, optional): The share of requests, between 0 and 1, that are answered with HTTP 429.
+        seed (int, optional): The seed of the random numbers used to pick the throttled requests.
+    """
+
+    def __init__(self, latency=0.0, throttle=0.0, seed=0):
+        self.latency = latency
+        self.throttle = throttle
+        self.random = random.Random(seed)
+        self.ids = itertools.count(1_000_000_000)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+        # - The number of upcoming requests answered with HTTP 429 regardless of the throttle share, and the
+        # - Retry-After seconds sent with every 429
+        self.throttle_next = 0
+        self.retry_after = 1
+        self.log = []
+        self.sheets = {}
+        self.workspaces = {}
+
+
+    def create_workspace(self, name="Benchmarks"):
+        """Creates an empty workspace.
+
+        Args:
+            name (str, optional): The name of the workspace.
+
+        Returns:
+            int: The ID of the workspace.
+        """
+        workspace_id = next(self.ids)
+        self.workspaces[workspace_id] = {"id": workspace_id, "name": name, "sheets": []}
+        return workspace_id
+
+
+    def create_sheet(self, name, workspace_id=None, columns=TEMPLATE_COLUMNS):
+        """Creates an empty sheet.
+
+        Args:
+            name (str): The name of the sheet.
+            workspace_id (int, optional): The ID of the workspace the sheet is created in.
+            columns (list, optional): The titles of the columns.
+
+        Returns:
+            dict: The sheet.
+        """
+        sheet_id = next(self.ids)
+        sheet = {
+            "id": sheet_id,
+            "name": name,
+            "version": 1,
+            "modifiedAt": now(),
+            "columns": [
+                {"id": next(self.ids), "index": index, "title": title, "type": "TEXT_NUMBER", "primary": index == 0}
+                for index, title in enumerate(columns)
+            ],
+            "rows": {},
+        }
+        self.sheets[sheet_id] = sheet
+        if workspace_id is not None:
+            self.workspaces[workspace_id]["sheets"].append(sheet_id)
+        return sheet
+
+
+    def sheet_json(self, sheet, column_ids=None, rows_modified_since=None, page_size=None):
+        """Builds the JSON of a sheet, as returned by GET /sheets/{id}."""
+        columns = [column for column in sheet["columns"] if not column_ids or column["id"] in column_ids]
+        since = datetime.fromisoformat(rows_modified_since) if rows_modified_since else None
+        rows = [
+            {
+                "id": row["id"],
+                "rowNumber": number,
+                "modifiedAt": row["modifiedAt"],
+                "cells": [{"columnId": column["id"], "value": row["cells"].get(column["id"])} for column in columns],
+            }
+            for number, row in enumerate(sheet["rows"].values(), start=1)
+            if since is None or datetime.fromisoformat(row["modifiedAt"]) > since
+        ]
+        if page_size is not None:
+            rows = rows[:page_size]
+        return {
+            "id": sheet["id"],
+            "name": sheet["name"],
+            "version": sheet["version"],
+            "modifiedAt": sheet["modifiedAt"],
+            "totalRowCount": len(sheet["rows"]),
+            "columns": columns,
+            "rows": rows,
+        }
+
+
+    def touch(self, sheet):
+        """Records that a sheet has changed."""
+        sheet["version"] += 1
+        sheet["modifiedAt"] = now()
+
+
+    def handle(self, method, path, query, body):
+        """Answers a request.
+
+        Args:
+            method (str): The HTTP method.
+            path (str): The path of the request, without the API version.
+            query (dict): The query string parameters.
+            body (Any): The decoded JSON body, or None.
+
+        Returns:
+            Tuple[int, dict]: The HTTP status and the JSON response.
+        """
+        parts = [part for part in path.split("/") if part]
+
+        with self.lock:
+            self.log.append((method, path, query))
+
+            if parts == ["serverinfo"]:
+                return 200, {"formats": {}, "supportedLocales": ["en_US"]}
+
+            if len(parts) == 2 and parts[0] == "workspaces" and method == "GET":
+                workspace = self.workspaces.get(int(parts[1]))
+                if workspace is None:
+                    return 404, error(1006, "Not Found")
+                sheets = [{"id": sheet_id, "name": self.sheets[sheet_id]["name"]} for sheet_id in workspace["sheets"]]
+                return 200, {"id": workspace["id"], "name": workspace["name"], "sheets": sheets}
+
+            if len(parts) == 3 and parts[0] == "workspaces" and parts[2] == "sheets" and method == "POST":
+                template = self.sheets[int(body["fromId"])]
+                sheet = self.create_sheet(body["name"], int(parts[1]), [column["title"] for column in template["columns"]])
+                return 200, {"message": "SUCCESS", "resultCode": 0, "result": {"id": sheet["id"], "name": sheet["name"]}}
+
+            if not parts or parts[0] != "sheets" or len(parts) < 2:
+                return 404, error(1006, "Not Found")
+
+            sheet = self.sheets.get(int(parts[1]))
+            if sheet is None:
+                return 404, error(1006, "Not Found")
+
+            if len(parts) == 2 and method == "GET":
+                column_ids = {int(column_id) for column_id in query.get("columnIds", "").split(",") if column_id}
+                page_size = int(query["pageSize"]) if "pageSize" in query else None
+                return 200, self.sheet_json(sheet, column_ids, query.get("rowsModifiedSince"), page_size)
+
+            if parts[2:] == ["columns"] and method == "GET":
+                columns = sheet["columns"]
+                return 200, {"pageNumber": 1, "totalPages": 1, "totalCount": len(columns), "data": columns}
+
+            if parts[2:] == ["version"]:
+                return 200, {"version": sheet["version"]}
+
+            if parts[2:] == ["rows"] and method == "POST":
+                modified_at = now()
+                added = []
+                for row in body:
+                    row_id = next(self.ids)
+                    cells = {cell["columnId"]: cell.get("value") for cell in row.get("cells", [])}
+                    sheet["rows"][row_id] = {"id": row_id, "cells": cells, "modifiedAt": modified_at}
+                    added.append({"id": row_id})
+                self.touch(sheet)
+                return 200, {"message": "SUCCESS", "resultCode": 0, "result": added, "version": sheet["version"]}
+
+            if parts[2:] == ["rows"] and method == "PUT":
+                modified_at = now()
+                for row in body:
+                    stored = sheet["rows"].get(row["id"])
+                    if stored is None:
+                        return 404, error(1006, f"Row {row['id']} not found")
+                    stored["cells"].update({cell["columnId"]: cell.get("value") for cell in row.get("cells", [])})
+                    stored["modifiedAt"] = modified_at
+                self.touch(sheet)
+                return 200, {"message": "SUCCESS", "resultCode": 0, "result": [{"id": row["id"]} for row in body]}
+
+            if parts[2:] == ["rows"] and method == "DELETE":
+                row_ids = [int(row_id) for row_id in query.get("ids", "").split(",") if row_id]
+                deleted = [row_id for row_id in row_ids if sheet["rows"].pop(row_id, None) is not None]
+                self.touch(sheet)
+                return 200, {"message": "SUCCESS", "resultCode": 0, "result": deleted}
+
+            if len(parts) == 4 and parts[2] == "rows" and method == "GET":
+                row = sheet["rows"].get(int(parts[3]))
+                if row is None:
+                    return 404, error(1006, "Not Found")
+                return 200, {
+                    "id": row["id"],
+                    "cells": [{"columnId": column_id, "value": value} for column_id, value in row["cells"].items()],
+                }
+
+            return 404, error(1006, "Not Found")
+
+
+    def should_throttle(self):
+        """Decides if the next request is answered with HTTP 429."""
+        with self.lock:
+            self.requests += 1
+            if self.throttle_next:
+                self.throttle_next -= 1
+                self.throttled += 1
+                return True
+            if self.throttle and self.random.random() < self.throttle:
+                self.throttled += 1
+                return True
+            return False
+
+
+def make_handler(fake):
+    """Builds the request handler class that serves a FakeSmartsheet."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def handle_request(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw_body = self.rfile.read(length) if length else b""
+
+            if fake.latency:
+                time.sleep(fake.latency)
+
+            if fake.should_throttle():
+                status, response, headers = 429, error(4003, "Rate limit exceeded."), {"Retry-After": str(fake.retry_after)}
+            else:
+                url = urlparse(self.path)
+                path = url.path.split("/2.0", 1)[-1]
+                query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                body = json.loads(raw_body) if raw_body else None
+                status, response = fake.handle(self.command, path, query, body)
+                headers = {}
+
+            content = json.dumps(response).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(content)
+
+        do_GET = do_POST = do_PUT = do_DELETE = handle_request
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_server(fake, port=0):
+    """Starts serving a FakeSmartsheet on a background thread.
+
+    Args:
+        fake (FakeSmartsheet): The fake API to serve.
+        port (int, optional): The port to listen on. Defaults to a free port.
+
+    Returns:
+        Tuple[ThreadingHTTPServer, str]: The server and the base URL of its API.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(fake))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/2.0"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serves a fake Smartsheet API for benchmarks.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request.")
+    parser.add_argument("--throttle", type=float, default=0.0, help="Share of requests answered with HTTP 429.")
+    args = parser.parse_args()
+
+    fake = FakeSmartsheet(args.latency, args.throttle)
+    workspace_id = fake.create_workspace()
+    template = fake.create_sheet("Template", workspace_id)
+    server, base_url = start_server(fake, args.port)
+    print(f"Serving {base_url} (workspace {workspace_id}, template sheet {template['id']})")
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,130 @@
+"""Generates synthetic Purchasing_Items workbooks for the benchmarks.
+
+Each workbook has one tab with the columns read by the import and update operations. The same seed always
+produces the same workbook, so benchmark runs can be compared with each other.
+
+    python -m benchmarks.generate_workbook --rows 50000 --output purchasing_50k.xlsx
+"""
+
+import argparse
+import random
+import openpyxl
+
+
+# - The header row of the Purchasing_Items tab
+COLUMNS = ["Item ID", "Item Description", "Quantity", "UOM", "Area", "Specific Area", "Awarded To"]
+
+UOMS = ["EA", "LF", "SF", "CY", "LS", "BOX", "GAL"]
+AREAS = ["Level 1", "Level 2", "Level 3", "Roof", "Basement", "Site", "Parking"]
+SPECIFIC_AREAS = ["North Wing", "South Wing", "Lobby", "Stair A", "Stair B", "Mechanical Room", None]
+VENDORS = ["Acme Supply", "Builders Depot", "Metro Electric", "Summit Plumbing", "Northline Steel", None]
+DESCRIPTIONS = ["Conduit", "Drywall Panel", "Copper Pipe", "Light Fixture", "Steel Beam", "Door Frame", "Ceiling Tile"]
+
+
+def make_rows(row_count, seed=0, duplicate_ratio=0.0, first_id=0):
+    """Builds the rows of a workbook.
+
+    Args:
+        row_count (int): The number of rows.
+        seed (int, optional): The seed of the random values.
+        duplicate_ratio (float, optional): The share of rows, between 0 and 1, that repeat the Item ID of an earlier row.
+        first_id (int, optional): The number in the Item ID of the first row.
+
+    Returns:
+        List[list]: The rows, in the order of COLUMNS.
+    """
+    rng = random.Random(seed)
+    rows = []
+    for index in range(row_count):
+        item_id = f"ITEM-{first_id + index:07d}"
+        if rows and rng.random() < duplicate_ratio:
+            item_id = rng.choice(rows)[0]
+
+        rows.append([
+            item_id,
+            f"{rng.choice(DESCRIPTIONS)} {rng.randint(1, 999)}",
+            float(rng.randint(1, 500)),
+            rng.choice(UOMS),
+            rng.choice(AREAS),
+            rng.choice(SPECIFIC_AREAS),
+            rng.choice(VENDORS),
+        ])
+
+    return rows
+
+
+def modify_rows(rows, seed=0, change_ratio=0.1, delete_ratio=0.02, add_ratio=0.02):
+    """Builds the rows of an updated version of a workbook.
+
+    Args:
+        rows (List[list]): The rows of the original workbook.
+        seed (int, optional): The seed of the random changes.
+        change_ratio (float, optional): The share of rows whose quantity and description are changed.
+        delete_ratio (float, optional): The share of rows that are removed.
+        add_ratio (float, optional): The number of new rows, as a share of the original rows.
+
+    Returns:
+        List[list]: The updated rows.
+    """
+    rng = random.Random(seed + 1)
+    updated = []
+    for row in rows:
+        if rng.random() < delete_ratio:
+            continue
+
+        row = list(row)
+        if rng.random() < change_ratio:
+            row[1] = f"{row[1]} (revised)"
+            row[2] = row[2] + rng.randint(1, 50)
+        updated.append(row)
+
+    first_new = len(rows)
+    for index in range(int(len(rows) * add_ratio)):
+        updated.append([
+            f"ITEM-{first_new + index:07d}",
+            f"{rng.choice(DESCRIPTIONS)} {rng.randint(1, 999)}",
+            float(rng.randint(1, 500)),
+            rng.choice(UOMS),
+            rng.choice(AREAS),
+            rng.choice(SPECIFIC_AREAS),
+            rng.choice(VENDORS),
+        ])
+
+    return updated
+
+
+def write_workbook(path, rows, tab_name="Purchasing_Items"):
+    """Writes rows to a workbook with a single tab.
+
+    The workbook is written in write-only mode, so large workbooks are streamed to the file instead of being
+    held in memory.
+
+    Args:
+        path (str): The path of the workbook.
+        rows (List[list]): The rows, in the order of COLUMNS.
+        tab_name (str, optional): The name of the tab.
+
+    Returns:
+        str: The path of the workbook.
+    """
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(tab_name)
+    sheet.append(COLUMNS)
+    for row in rows:
+        sheet.append(row)
+
+    workbook.save(path)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generates a synthetic Purchasing_Items workbook.")
+    parser.add_argument("--rows", type=int, default=1000, help="Number of rows, for example 1000 to 200000.")
+    parser.add_argument("--output", default="purchasing_items.xlsx")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--duplicates", type=float, default=0.0, help="Share of rows that repeat an earlier Item ID.")
+    parser.add_argument("--tab", default="Purchasing_Items")
+    args = parser.parse_args()
+
+    write_workbook(args.output, make_rows(args.rows, args.seed, args.duplicates), args.tab)
+    print(f"Wrote {args.rows} rows to {args.output}")
@@ -0,0 +1,222 @@
+"""Times the create, import, import with duplicates and update operations against a fake Smartsheet server.
+
+A fake server is started on a free local port and the operations are run end to end through the same functions
+the GUI calls, on synthetic Purchasing_Items workbooks of each requested size. The time of every operation and
+of each of its phases is compared with a stored baseline, and the run fails if any operation got slower than
+the tolerance allows.
+
+    python -m benchmarks.run_benchmarks --rows 1000 10000 --latency 0.05 --throttle 0.01
+    python -m benchmarks.run_benchmarks --rows 1000 10000 --save-baseline
+
+A run without a baseline fails, unless --allow-missing-baseline is given, so a missing baseline is never
+mistaken for a run without regressions.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from .fake_smartsheet_server import FakeSmartsheet, start_server
+from .generate_workbook import make_rows, modify_rows, write_workbook
+
+
+# - The operations in the order they are run, with the GUI option each one uses
+SCENARIOS = [
+    ("create", "-NEW-"),
+    ("import", "-IMPORT-"),
+    ("update", "-UPDATE-"),
+    ("import_with_duplicates", "-IMPORT WITH DUPLICATES-"),
+]
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+
+
+def configure(base_url, workspace_id, template_id, cache_dir, rate_limit):
+    """Points the settings at the fake server.
+
+    The settings are read when the core package is first imported, so this must run before it is imported.
+    """
+    os.environ.update({
+        "SMARTSHEET_API_BASE": base_url,
+        "SMARTSHEET_API_KEY": "benchmark",
+        "LIVE_WORKSPACE_ID": str(workspace_id),
+        "TEMPLATE_SHEET_ID": str(template_id),
+        "EXCEL_TAB": "Purchasing_Items",
+        "TABLE_NAME": "Purchasing_Items",
+        "SMARTSHEET_CACHE_DIR": cache_dir,
+        "SMARTSHEET_RATE_LIMIT": str(rate_limit),
+        "SMARTSHEET_REPORT_DIR": "",
+        "SMARTSHEET_PROMETHEUS_FILE": "",
+    })
+
+
+def make_workbooks(row_count, folder, seed=0):
+    """Writes the workbooks used by the scenarios of one size.
+
+    Args:
+        row_count (int): The number of rows in the imported workbook.
+        folder (str): The folder the workbooks are written to.
+        seed (int, optional): The seed of the random values.
+
+    Returns:
+        dict: The path of the workbook each scenario reads.
+    """
+    rows = make_rows(row_count, seed)
+
+    # - Half of the rows of the duplicates workbook share an Item ID with the rows already in the sheet,
+    # - and some repeat an Item ID within the workbook itself
+    duplicate_rows = make_rows(row_count, seed + 2, duplicate_ratio=0.05, first_id=row_count // 2)
+
+    return {
+        "import": write_workbook(os.path.join(folder, f"import_{row_count}.xlsx"), rows),
+        "update": write_workbook(os.path.join(folder, f"update_{row_count}.xlsx"), modify_rows(rows, seed)),
+        "import_with_duplicates": write_workbook(os.path.join(folder, f"duplicates_{row_count}.xlsx"), duplicate_rows),
+    }
+
+
+def run_size(row_count, workbooks):
+    """Runs every scenario on one workbook size.
+
+    Args:
+        row_count (int): The number of rows in the imported workbook.
+        workbooks (dict): The path of the workbook each scenario reads.
+
+    Returns:
+        dict: The results of each scenario, keyed by "<scenario>/<rows>".
+    """
+    from core.metrics import metrics
+    from core.smartsheet_functions.create_new_sheet import create_new_smartsheet
+    from core.smartsheet_functions.import_excel_data import import_excel_data
+
+    sheet_name = f"Benchmark {row_count} {time.time_ns()}"
+    results = {}
+
+    for scenario, option in SCENARIOS:
+        metrics.reset()
+        start = time.perf_counter()
+        if scenario == "create":
+            response = create_new_smartsheet(sheet_name)
+        else:
+            response = import_excel_data(option, workbooks[scenario], sheet_name)
+        seconds = time.perf_counter() - start
+
+        report = metrics.report(scenario)
+        results[f"{scenario}/{row_count}"] = {
+            "seconds": round(seconds, 3),
+            "phases": {phase: record["total_seconds"] for phase, record in report["phases"].items()},
+            "counters": report["counters"],
+            "response": str(response)[:200],
+        }
+        print(f"{scenario:<24}{row_count:>8} rows {seconds:>9.3f}s  {str(response)[:60]}")
+
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta):
+    """Compares the results with the baseline.
+
+    Args:
+        results (dict): The results of this run.
+        baseline (dict): The results of the baseline run.
+        tolerance (float): How much slower, as a share of the baseline time, an operation may get.
+        min_delta (float): The number of seconds an operation may get slower regardless of the tolerance,
+            so very fast operations do not fail on noise.
+
+    Returns:
+        List[str]: A line for each operation that got slower than allowed.
+    """
+    regressions = []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            print(f"{key:<32} no baseline")
+            continue
+
+        change = (result["seconds"] - previous["seconds"]) / previous["seconds"] if previous["seconds"] else 0.0
+        print(f"{key:<32} {previous['seconds']:>9.3f}s -> {result['seconds']:>9.3f}s ({change:+.1%})")
+
+        if result["seconds"] > previous["seconds"] * (1 + tolerance) and result["seconds"] - previous["seconds"] > min_delta:
+            slowest = max(
+                result["phases"],
+                key=lambda phase: result["phases"][phase] - previous["phases"].get(phase, 0.0),
+                default=None,
+            )
+            regressions.append(f"{key} took {result['seconds']:.3f}s, baseline {previous['seconds']:.3f}s (largest increase: {slowest})")
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks the Smartsheet operations against a fake server.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000], help="Workbook sizes, for example 1000 50000 200000.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the fake server adds to every request.")
+    parser.add_argument("--throttle", type=float, default=0.0, help="Share of requests the fake server answers with HTTP 429.")
+    parser.add_argument("--rate-limit", type=int, default=100_000,
+                        help="Requests per minute allowed by the client. The fake server has no quota, so the default "
+                             "leaves the client's pacing out of the timings; use 290 to include it.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--save-baseline", action="store_true", help="Save the results as the new baseline.")
+    parser.add_argument("--allow-missing-baseline", action="store_true",
+                        help="Pass when there is no baseline to compare with, instead of failing.")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--min-delta", type=float, default=0.25)
+    parser.add_argument("--output", help="File the results of this run are written to.")
+    args = parser.parse_args(argv)
+
+    fake = FakeSmartsheet(args.latency, args.throttle, args.seed)
+    workspace_id = fake.create_workspace()
+    template = fake.create_sheet("Purchasing Template", workspace_id)
+    server, base_url = start_server(fake)
+
+    with tempfile.TemporaryDirectory() as folder:
+        configure(base_url, workspace_id, template["id"], os.path.join(folder, "cache"), args.rate_limit)
+
+        results = {}
+        for row_count in args.rows:
+            workbooks = make_workbooks(row_count, folder, args.seed)
+            results.update(run_size(row_count, workbooks))
+
+    server.shutdown()
+
+    run = {
+        "settings": {"latency": args.latency, "throttle": args.throttle, "rate_limit": args.rate_limit},
+        "requests": fake.requests,
+        "throttled": fake.throttled,
+        "results": results,
+    }
+    print(f"Fake server answered {fake.requests} requests, {fake.throttled} of them with HTTP 429")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(run, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(run, f, indent=2)
+        print(f"Saved the baseline to {args.baseline}")
+        return 0
+
+    if not os.path.isfile(args.baseline):
+        print(f"No baseline at {args.baseline}, run with --save-baseline to create one")
+        return 0 if args.allow_missing_baseline else 2
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    if baseline["settings"] != run["settings"]:
+        print(f"Warning: the baseline was run with {baseline['settings']}, this run used {run['settings']}")
+
+    regressions = compare(results, baseline["results"], args.tolerance, args.min_delta)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""Guards the cold start of main.py.
+
+Imports main.py in a fresh interpreter several times, and fails if the median import takes longer than the
+budget or if any of the heavy modules that should only be loaded when an action first needs them were
+imported.
+
+    python -m benchmarks.startup_time --runs 5 --budget 0.5
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+
+# - Modules that must not be loaded before the main window appears
+HEAVY_MODULES = ["pandas", "numpy", "openpyxl", "smartsheet", "aiohttp", "dotenv"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "loaded": [name for name in %r if name in sys.modules]}))
+"""
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def measure():
+    """Imports main.py in a fresh interpreter.
+
+    Returns:
+        dict: The seconds the import took and the heavy modules it loaded.
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE % HEAVY_MODULES],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Checks how long main.py takes to import.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=0.5, help="Largest median import time in seconds.")
+    args = parser.parse_args(argv)
+
+    results = [measure() for _ in range(args.runs)]
+    median = statistics.median(result["seconds"] for result in results)
+    loaded = sorted({name for result in results for name in result["loaded"]})
+
+    print(f"main.py imported in {median:.3f}s (median of {args.runs} runs, budget {args.budget:.3f}s)")
+
+    failed = False
+    if loaded:
+        print(f"FAIL: main.py loaded {', '.join(loaded)} at startup")
+        failed = True
+    if median > args.budget:
+        print(f"FAIL: main.py took {median:.3f}s to import, over the {args.budget:.3f}s budget")
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
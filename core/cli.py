@@ -0,0 +1,302 @@
+"""Runs imports, updates and sheet creation without the GUI.
+
+A manifest lists the jobs to run, one (workbook, sheet, operation) per job, as a JSON list or a CSV file with
+those three columns. The jobs of different sheets run at the same time on a bounded pool of workers, while the
+jobs of the same sheet run one after another in manifest order, so a sheet can be created and then imported
+into by the same manifest. Every job shares the same Smartsheet client and rate limit. The sheets whose first job is an update are
+downloaded together on the asyncio engine before any job starts, so those jobs find their sheets in the snapshot
+cache.
+
+    python -m core.cli run nightly.json --workers 4 --summary summary.json
+    python -m core.cli run nightly.csv --dry-run
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from .config import settings
+from .metrics import metrics
+from .smartsheet_classes.progress import OperationCancelled, Progress
+from .smartsheet_classes.smartsheet_api import SmartSheetApi
+from .smartsheet_functions.create_new_sheet import create_new_smartsheet
+from .smartsheet_functions.import_excel_data import import_excel_data
+from .smartsheet_functions.update_data_in_smartsheet import UPDATE_COLUMN_MAP
+
+
+# - The option each manifest operation is run with, as used by the GUI
+OPERATIONS = {
+    "create": "-NEW-",
+    "import": "-IMPORT-",
+    "import_with_duplicates": "-IMPORT WITH DUPLICATES-",
+    "update": "-UPDATE-",
+}
+
+# - The results returned by import_excel_data that mean the job did what was asked
+SUCCESS_KEYS = {"Update successful.", "No Differences", "Dry Run"}
+
+
+def read_manifest(path):
+    """Reads the jobs in a manifest.
+
+    Args:
+        path (str): The path of a JSON or CSV manifest. Relative workbook paths are relative to the manifest.
+
+    Returns:
+        List[Dict[str, str]]: The workbook, sheet and operation of each job, in manifest order.
+
+    Raises:
+        ValueError: If a job is missing its sheet or workbook, or has an unknown operation.
+    """
+    if path.lower().endswith(".csv"):
+        with open(path, newline="") as f:
+            entries = list(csv.DictReader(f))
+    else:
+        with open(path) as f:
+            entries = json.load(f)
+        if isinstance(entries, dict):
+            entries = entries["jobs"]
+
+    folder = os.path.dirname(os.path.abspath(path))
+    jobs = []
+    for number, entry in enumerate(entries, start=1):
+        operation = (entry.get("operation") or "").strip().lower()
+        sheet = (entry.get("sheet") or "").strip()
+        workbook = (entry.get("workbook") or "").strip()
+
+        if operation not in OPERATIONS:
+            raise ValueError(f"Job {number} has an unknown operation '{operation}', expected one of {', '.join(OPERATIONS)}")
+        if not sheet or (operation != "create" and not workbook):
+            raise ValueError(f"Job {number} needs a sheet{'' if operation == 'create' else ' and a workbook'}")
+
+        if workbook:
+            workbook = os.path.join(folder, workbook)
+        jobs.append({"workbook": workbook, "sheet": sheet, "operation": operation})
+
+    return jobs
+
+
+def describe_result(result):
+    """Decides if a job succeeded from the value returned by import_excel_data.
+
+    Args:
+        result (Any): The value returned by import_excel_data.
+
+    Returns:
+        str: "succeeded" or "failed".
+    """
+    # - Errors are returned as a list starting with an error key, successful imports as a string or tuple
+    if isinstance(result, list):
+        return "succeeded" if result and result[0] in SUCCESS_KEYS else "failed"
+
+    return "succeeded" if isinstance(result, (str, tuple)) else "failed"
+
+
+def run_job(job, progress, dry_run=False):
+    """Runs one job.
+
+    Args:
+        job (Dict[str, str]): The workbook, sheet and operation of the job.
+        progress (Progress): The progress that can cancel the job between batches.
+        dry_run (bool, optional): True to only report what update jobs would change.
+
+    Returns:
+        dict: The job, whether it succeeded, its result and how long it took.
+    """
+    # - Only updates can be previewed, creating or importing would change the workspace
+    if dry_run and job["operation"] != "update":
+        return {**job, "status": "skipped", "result": "Only updates are run in a dry run", "seconds": 0.0}
+
+    start = time.perf_counter()
+    try:
+        if job["operation"] == "create":
+            sheet = create_new_smartsheet(job["sheet"])
+            status, result = ("succeeded", f"Created sheet {sheet.id}") if sheet is not None else ("failed", "The sheet could not be created")
+        else:
+            result = import_excel_data(
+                OPERATIONS[job["operation"]], job["workbook"], job["sheet"], dry_run=dry_run, progress=progress
+            )
+            status = describe_result(result)
+    except OperationCancelled as e:
+        status, result = "cancelled", str(e)
+    except Exception as e:
+        status, result = "failed", f"{type(e).__name__}: {e}"
+
+    return {**job, "status": status, "result": result, "seconds": round(time.perf_counter() - start, 3)}
+
+
+def run_sheet_jobs(jobs, progress, dry_run=False, report=None):
+    """Runs the jobs of one sheet one after another.
+
+    Args:
+        jobs (List[dict]): The jobs of the sheet, in manifest order.
+        progress (Progress): The progress shared by every job of the run.
+        dry_run (bool, optional): True to only report what update jobs would change.
+        report (callable, optional): Called with the summary of each job when it finishes.
+
+    Returns:
+        List[dict]: The summary of each job.
+    """
+    summaries = []
+    for job in jobs:
+        if progress.cancelled:
+            summary = {**job, "status": "cancelled", "result": "Not started", "seconds": 0.0}
+        else:
+            summary = run_job(job, progress, dry_run)
+        summaries.append(summary)
+        if report is not None:
+            report(summary)
+
+        # - Later jobs of the same sheet depend on this one, so they are skipped if it failed
+        if summary["status"] in ("failed", "cancelled"):
+            for skipped in jobs[len(summaries):]:
+                summaries.append({**skipped, "status": "skipped", "result": f"An earlier job of sheet '{job['sheet']}' {summary['status']}", "seconds": 0.0})
+            break
+
+    return summaries
+
+
+def prefetch_sheets(sheets):
+    """Downloads the sheets whose first job is an update at the same time, before any job runs.
+
+    Only the columns an update compares are downloaded. The sheets are downloaded on the asyncio engine and
+    saved to the snapshot cache, so their update jobs only check that each sheet's version has not changed
+    instead of downloading the sheet again. Sheets that are created or imported into first would change before
+    their update, so they are not downloaded.
+
+    Args:
+        sheets (Dict[str, List[dict]]): The jobs of each sheet, in manifest order.
+
+    Returns:
+        int: The number of sheets downloaded.
+    """
+    names = [sheet_jobs[0]["sheet"] for sheet_jobs in sheets.values() if sheet_jobs[0]["operation"] == "update"]
+
+    # - A single sheet gains nothing from being downloaded ahead of its job
+    if len(names) < 2:
+        return 0
+
+    try:
+        sheet_manager = SmartSheetApi(api_key=settings.API_KEY, workspace_id=int(settings.WORKSPACE_ID))
+        column_ids = {}
+        for name in names:
+            sheet_manager.sheet_name = name
+            sheet_id = sheet_manager.get_sheet_id_by_name()
+            if sheet_id:
+                columns = sheet_manager.get_columns()
+                column_ids[sheet_id] = [columns[title] for title in UPDATE_COLUMN_MAP.values() if title in columns]
+
+        with metrics.span("prefetch"):
+            return len(sheet_manager.load_snapshots(list(column_ids), column_ids))
+    except Exception as e:
+        # - The jobs download their own sheets if the prefetch fails
+        print(f"Could not download the sheets ahead of their jobs: {e}", file=sys.stderr)
+        return 0
+
+
+def run_manifest(jobs, workers=4, dry_run=False, progress=None):
+    """Runs the jobs of a manifest, running the jobs of different sheets at the same time.
+
+    Args:
+        jobs (List[dict]): The workbook, sheet and operation of each job.
+        workers (int, optional): The number of sheets worked on at the same time.
+        dry_run (bool, optional): True to only report what update jobs would change.
+        progress (Progress, optional): The progress that can cancel the run between batches.
+
+    Returns:
+        dict: The summary of the run, with the result of each job in manifest order and the run's metrics.
+    """
+    progress = progress or Progress()
+    started_at = datetime.now()
+    start = time.perf_counter()
+    metrics.reset()
+
+    # - Jobs are grouped by sheet so two jobs never write to the same sheet at once
+    sheets = {}
+    for index, job in enumerate(jobs):
+        sheets.setdefault(job["sheet"].casefold(), []).append({**job, "index": index})
+
+    prefetch_sheets(sheets)
+
+    finished = 0
+    finished_lock = threading.Lock()
+
+    def report(summary):
+        nonlocal finished
+        with finished_lock:
+            finished += 1
+            print(f"[{finished}/{len(jobs)}] {summary['operation']} '{summary['sheet']}': {summary['status']} ({summary['seconds']}s)", file=sys.stderr)
+
+    summaries = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_sheet_jobs, sheet_jobs, progress, dry_run, report) for sheet_jobs in sheets.values()]
+        try:
+            for future in as_completed(futures):
+                summaries.extend(future.result())
+        except KeyboardInterrupt:
+            # - Stops every job before its next batch; the batches already sent are kept
+            progress.cancel()
+            for future in futures:
+                future.cancel()
+            raise
+
+    summaries.sort(key=lambda summary: summary["index"])
+    for summary in summaries:
+        del summary["index"]
+    counts = {status: sum(summary["status"] == status for summary in summaries) for status in ("succeeded", "failed", "skipped", "cancelled")}
+
+    return {
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "duration_seconds": round(time.perf_counter() - start, 3),
+        "dry_run": dry_run,
+        "counts": counts,
+        "jobs": summaries,
+        "metrics": metrics.report("batch"),
+    }
+
+
+def main(argv=None):
+    """Runs the command line interface.
+
+    Args:
+        argv (List[str], optional): The command line arguments. Defaults to sys.argv.
+
+    Returns:
+        int: 0 if no job failed or was cancelled, 1 if any did, 2 if the manifest is invalid.
+    """
+    parser = argparse.ArgumentParser(prog="python -m core.cli", description="Runs Smartsheet imports and updates without the GUI.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Runs the jobs in a manifest.")
+    run_parser.add_argument("manifest", help="A JSON or CSV file of jobs with workbook, sheet and operation fields.")
+    run_parser.add_argument("--workers", type=int, default=4, help="Number of sheets worked on at the same time (default 4).")
+    run_parser.add_argument("--dry-run", action="store_true", help="Only report what update jobs would change, and skip the other jobs.")
+    run_parser.add_argument("--summary", help="File the JSON summary is written to. Printed if not given.")
+
+    args = parser.parse_args(argv)
+
+    try:
+        jobs = read_manifest(args.manifest)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Could not read the manifest: {e}", file=sys.stderr)
+        return 2
+
+    summary = run_manifest(jobs, workers=max(args.workers, 1), dry_run=args.dry_run)
+    metrics.export("batch")
+
+    if args.summary:
+        with open(args.summary, "w") as f:
+            json.dump(summary, f, indent=2, default=str)
+    else:
+        print(json.dumps(summary, indent=2, default=str))
+
+    return 1 if summary["counts"]["failed"] or summary["counts"]["cancelled"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,19 @@
 import os
+import threading
 from pathlib import Path
-from dotenv import load_dotenv, find_dotenv
 
 env_path = Path(".") / ".env"
-load_dotenv(
-    dotenv_path="C:/Users/jbailey/Documents/Python_Projects/smartsheet_purchasing/.env"
-)
-# or load from the first .env file found
-load_dotenv(dotenv_path=find_dotenv())
+
+
+def load_environment():
+    """Loads the .env file into the environment variables. Variables that are already set are not changed."""
+    from dotenv import load_dotenv, find_dotenv
+
+    load_dotenv(
+        dotenv_path="C:/Users/jbailey/Documents/Python_Projects/smartsheet_purchasing/.env"
+    )
+    # or load from the first .env file found
+    load_dotenv(dotenv_path=find_dotenv())
 
 
 class Settings:
@@ -15,6 +21,7 @@ class Settings:
 
     Attributes:
         SMARTSHEET_API_URL (str): The base URL for accessing the Smartsheet API.
+        SMARTSHEET_API_BASE (str): The root URL of the Smartsheet REST API, used by the shared client and the async engine.
         API_KEY (str): The API key used for authenticating requests to the Smartsheet API.
         TEMPLATE_SHEET (str): The ID of the Smartsheet template sheet to use.
         WORKSPACE_ID (str): The ID of the Smartsheet workspace to use for production.
@@ -23,24 +30,81 @@ class Settings:
         TEST_WORKSPACE_ID (str): The ID of the Smartsheet workspace to use during testing.
         EXCEL_TAB (str): The name of the tab in the Excel sheet to use.
         TABLE_NAME (str): The name of the table in the Excel sheet to use.
+        BATCH_SIZE (int): The number of rows sent to the Smartsheet API in each bulk request.
+        MAX_WORKERS (int): The number of bulk requests that can be sent at the same time.
+        RATE_LIMIT (int): The number of Smartsheet API requests allowed per minute for each API key.
+        MAX_RETRIES (int): The number of times a rate limited Smartsheet API request is retried.
+        MAX_CONNECTIONS (int): The number of keep-alive connections in the shared Smartsheet client's pool.
+        CACHE_DIR (str): The folder where the snapshot cache and other cached data are saved.
+        CACHE_MAX_MB (int): The largest size of the snapshot cache, in megabytes.
+        WORKBOOK_CACHE_MAX_MB (int): The largest size of the cache of parsed workbooks, in megabytes.
+        REPORT_DIR (str): The folder a JSON report of each run is written to. Reports are not written if it is empty.
+        PROMETHEUS_FILE (str): The file the metrics of the last run are written to in Prometheus text format. Not written if it is empty.
+        SHEET_NAME_TTL (int): The number of seconds the names and IDs of the sheets in a folder or workspace are reused before they are listed again.
+    """
+
+    def __init__(self):
+        load_environment()
+
+        # - SmartSheet Urls
+        self.SMARTSHEET_API_URL = "https://api.smartsheet.com/2.0/sheets/"
+        self.SMARTSHEET_API_BASE = os.getenv("SMARTSHEET_API_BASE", "https://api.smartsheet.com/2.0")
+
+        # - Production Credentials
+        self.API_KEY = os.getenv("SMARTSHEET_API_KEY")
+        self.TEMPLATE_SHEET = os.getenv("TEMPLATE_SHEET_ID")
+        self.WORKSPACE_ID = os.getenv("LIVE_WORKSPACE_ID")
+
+        # - Basic Testing Credentials
+        self.TEST_API_KEY = os.getenv("TEST_API_KEY")
+        self.TEST_TEMPLATE_ID = os.getenv("TEST_TEMPLATE_ID")
+        self.TEST_WORKSPACE_ID = os.getenv("TEST_WORKSPACE_ID")
+
+        # - Excel Sheet Info
+        self.EXCEL_TAB = os.getenv("EXCEL_TAB")
+        self.TABLE_NAME = os.getenv("TABLE_NAME")
+
+        # - Bulk Write Settings
+        self.BATCH_SIZE = int(os.getenv("SMARTSHEET_BATCH_SIZE", 400))
+        self.MAX_WORKERS = int(os.getenv("SMARTSHEET_MAX_WORKERS", 4))
+
+        # - Rate Limit Settings (Smartsheet allows 300 requests per minute for each API key)
+        self.RATE_LIMIT = int(os.getenv("SMARTSHEET_RATE_LIMIT", 290))
+        self.MAX_RETRIES = int(os.getenv("SMARTSHEET_MAX_RETRIES", 5))
+
+        # - Connection Pool Settings
+        self.MAX_CONNECTIONS = int(os.getenv("SMARTSHEET_MAX_CONNECTIONS", 16))
+
+        # - Local Cache Settings
+        self.CACHE_DIR = os.getenv("SMARTSHEET_CACHE_DIR", str(Path.home() / ".smartsheet_purchasing"))
+        self.CACHE_MAX_MB = int(os.getenv("SMARTSHEET_CACHE_MAX_MB", 200))
+        self.WORKBOOK_CACHE_MAX_MB = int(os.getenv("WORKBOOK_CACHE_MAX_MB", 500))
+        self.SHEET_NAME_TTL = int(os.getenv("SMARTSHEET_SHEET_NAME_TTL", 300))
+
+        # - Run Report Settings
+        self.REPORT_DIR = os.getenv("SMARTSHEET_REPORT_DIR", "")
+        self.PROMETHEUS_FILE = os.getenv("SMARTSHEET_PROMETHEUS_FILE", "")
+
+
+class LazySettings:
+    """The settings, created the first time one of them is read.
+
+    Importing a module that uses the settings does not load the .env file, so the main window can open before
+    any setting is needed.
     """
 
-    # - SmartSheet Urls
-    SMARTSHEET_API_URL = "https://api.smartsheet.com/2.0/sheets/"
+    def __init__(self):
+        self.loaded = None
+        self.lock = threading.Lock()
 
-    # - Production Credentials
-    API_KEY = os.getenv("SMARTSHEET_API_KEY")
-    TEMPLATE_SHEET = os.getenv("TEMPLATE_SHEET_ID")
-    WORKSPACE_ID = os.getenv("LIVE_WORKSPACE_ID")
 
-    # - Basic Testing Credentials
-    TEST_API_KEY = os.getenv("TEST_API_KEY")
-    TEST_TEMPLATE_ID = os.getenv("TEST_TEMPLATE_ID")
-    TEST_WORKSPACE_ID = os.getenv("TEST_WORKSPACE_ID")
+    def __getattr__(self, name):
+        if self.loaded is None:
+            with self.lock:
+                if self.loaded is None:
+                    self.loaded = Settings()
 
-    # - Excel Sheet Info
-    EXCEL_TAB = os.getenv("EXCEL_TAB")
-    TABLE_NAME = os.getenv("TABLE_NAME")
+        return getattr(self.loaded, name)
 
 
-settings = Settings()
+settings = LazySettings()
@@ -1,5 +1,7 @@
 import os
+import openpyxl
 import pandas as pd
+from ..metrics import metrics
 
 class ExcelSheetManager:
     """Manages an Excel sheet.
@@ -9,15 +11,21 @@ class ExcelSheetManager:
         file_location (str): The location of the Excel file.
         tab_name (str): The name of the tab in the Excel file to be read.
         table_name (str, optional): The name of the table within the tab to be read.
+        columns (Dict[str, Any], optional): The names and dtypes of the columns to read. If provided, only these
+            columns are read, and the tab is rejected if any of them are missing. Defaults to every column.
+        cache (WorkbookCache, optional): The cache of parsed workbooks to read from and save to.
     """
     
-    def __init__(self, file_name = None, file_location=None, tab_name=None, filebrowse_url=None, table_name=None):
+    def __init__(self, file_name = None, file_location=None, tab_name=None, filebrowse_url=None, table_name=None, columns=None, cache=None):
+        self.cache = cache
+        self.columns = columns
         self.file_name = file_name
         self.file_location = file_location
         self.tab_name = tab_name
         self.filebrowse_url = filebrowse_url
         self.table_name = table_name
         self.data = None
+        self.frame = None
 
 
 
@@ -51,17 +59,20 @@ class ExcelSheetManager:
 
 
 
-    def check_tab(self):
+    def check_tab(self, xls=None):
         """Checks if the tab name exists in the Excel file.
 
+        Args:
+            xls (pd.ExcelFile, optional): The already opened Excel file. If not provided, the file is opened.
+
         Returns:
             bool: True if the tab name is valid, False otherwise.
             str: A message to the user if the tab name is invalid.
         """
 
-        # Creates an ExcelFile object from the Excel file
-        # Uses a ternary operator to choose the file path based on the filebrowse_url attribute
-        xls = pd.ExcelFile(self.filebrowse_url if self.filebrowse_url else fr"{self.file_location}/{self.file_name}.xlsx")
+        # Creates an ExcelFile object from the Excel file if one was not provided
+        if xls is None:
+            xls = pd.ExcelFile(self.file_path(), engine='openpyxl')
 
         # Checks if the tab name is in the list of sheet names
         if self.tab_name in xls.sheet_names:
@@ -73,34 +84,224 @@ class ExcelSheetManager:
         
 
 
+    def file_path(self):
+        """Returns the path of the Excel file.
+
+        Returns:
+            str: The file browse URL if one was provided, otherwise the file location and file name.
+        """
+        return self.filebrowse_url if self.filebrowse_url else fr"{self.file_location}/{self.file_name}.xlsx"
+
+
+
+    def check_columns(self, header):
+        """Checks if the required columns exist in the tab.
+
+        Args:
+            header (Iterable[str]): The column names in the first row of the tab.
+
+        Returns:
+            bool: True if every required column exists, False otherwise.
+            List[str]: The names of the missing columns.
+        """
+        header = set(header)
+        missing_columns = [column for column in (self.columns or {}) if column not in header]
+
+        return not missing_columns, missing_columns
+
+
+
     def read_data(self):
-        """Reads data from the specified tab in the Excel file.
+        """Reads data from the specified tab in the Excel file as a list of rows.
 
         Returns:
             List[Dict[str, Any]]: A list of dictionaries, where each dictionary represents a row in the tab and contains data for each column.
-            Dict[str, int]: A dictionary that contains the names and IDs of the columns in the tab.
+            List[str]: A message to the user if the file, tab or columns are invalid.
             str: A message to the user if there is an error in reading the data.
         """
 
-        # Calls the check_file and check_tab methods to see if the file and tab can be read
-        # Uses a for loop to iterate over the methods and check their status
-        for check_method in [self.check_file, self.check_tab]:
-            status, message = check_method()
-            # If the status is False, returns the message
-            if not status:
-                return [message]
+        # Returns the data converted by an earlier call
+        if self.data is not None:
+            return self.data
+
+        df = self.read_frame()
+        if not isinstance(df, pd.DataFrame):
+            return df
+
+        self.data = df.to_dict('records')
+        return self.data
+
+
+
+    def read_frame(self):
+        """Reads data from the specified tab in the Excel file into a DataFrame.
+
+        The workbook is parsed once: the tab is validated and read from the same opened file, and the result is
+        kept in the frame attribute so later calls return it without reading the file again. If columns were
+        provided, only those columns are read and they are converted to the given dtypes while parsing. If a cache
+        was provided and it has the parsed data of this exact workbook, the workbook is not parsed at all.
+
+        Returns:
+            pd.DataFrame: The data in the tab, with one column for each column in the tab.
+            List[str]: ["Missing Columns", missing_columns] if any required columns are missing, or a message to the user if the file or tab is invalid.
+            str: A message to the user if there is an error in reading the data.
+        """
+
+        # Returns the data parsed by an earlier call
+        if self.frame is not None:
+            return self.frame
+
+        # Calls the check_file method to see if the file can be read
+        status, message = self.check_file()
+        if not status:
+            return [message]
 
         try:
-            # Reads data from the specified tab in the Excel file
-            # Uses a ternary operator to choose the file path based on the filebrowse_url attribute
-            df = pd.read_excel(self.filebrowse_url if self.filebrowse_url else fr"{self.file_location}/{self.file_name}.xlsx", engine='openpyxl', sheet_name=self.tab_name, header=0)
+            # Loads the data parsed from an identical workbook by an earlier run
+            cache_key = self.cache.key(self.file_path(), self.tab_name, self.columns) if self.cache else None
+            df = self.cache.load(cache_key) if cache_key else None
+
+            if df is None:
+                with metrics.span("excel_parse"):
+                    df = self.parse_tab()
+                if isinstance(df, list):
+                    return df
+
+                if cache_key:
+                    self.cache.save(cache_key, df)
 
             # Checks if the Excel tab is empty
             if df.empty:
                 return ["Empty Tab"]
 
-            self.data = df.to_dict('records')
-            return self.data
+            self.frame = df
+            return self.frame
 
         except Exception as e:
             return f"An error occurred while reading the data: {e}"
+
+
+
+    def parse_tab(self):
+        """Parses the specified tab in the Excel file into a DataFrame.
+
+        Returns:
+            pd.DataFrame: The data in the tab.
+            List[str]: A message to the user if the tab or its columns are invalid.
+        """
+
+        # Opens the workbook once, then checks the tab and reads the data from it
+        with pd.ExcelFile(self.file_path(), engine='openpyxl') as xls:
+            status, message = self.check_tab(xls)
+            if not status:
+                return [message]
+
+            if not self.columns:
+                return xls.parse(sheet_name=self.tab_name, header=0)
+
+            # Reads only the header row first, so missing columns are caught before the data is parsed
+            status, missing_columns = self.check_columns(xls.parse(sheet_name=self.tab_name, header=0, nrows=0).columns)
+            if not status:
+                return ["Missing Columns", missing_columns]
+
+            return xls.parse(sheet_name=self.tab_name, header=0, usecols=list(self.columns), dtype=self.columns)
+
+
+
+    def stream_data(self, chunk_size=1000):
+        """Reads data from the specified tab in the Excel file as a stream of fixed size chunks.
+
+        The workbook is opened in read-only mode and the rows are read one at a time, so the whole tab is never held in memory.
+
+        Args:
+            chunk_size (int, optional): The number of rows in each chunk.
+
+        Returns:
+            Generator[List[Dict[str, Any]]]: A generator of chunks, where each chunk is a list of dictionaries representing rows in the tab.
+            List[str]: A message to the user if the file or tab cannot be read, or ["Missing Columns", missing_columns].
+        """
+
+        # Calls the check_file method to see if the file can be read
+        status, message = self.check_file()
+        if not status:
+            return [message]
+
+        # Opening a workbook in read-only mode only reads the list of tabs, not their contents
+        workbook = openpyxl.load_workbook(self.file_path(), read_only=True, data_only=True)
+        if self.tab_name not in workbook.sheetnames:
+            workbook.close()
+            return ["Incorrect Tab Name"]
+
+        rows = workbook[self.tab_name].iter_rows(values_only=True)
+        header = next(rows, None) or ()
+
+        status, missing_columns = self.check_columns(header)
+        if not status:
+            workbook.close()
+            return ["Missing Columns", missing_columns]
+
+        # Keeps the position of each column that will be read
+        columns = self.columns or dict.fromkeys(name for name in header if name is not None)
+        positions = {name: header.index(name) for name in columns}
+
+        return self.iter_chunks(workbook, rows, positions, chunk_size)
+
+
+
+    def collect(self, chunks):
+        """Reads the rest of a stream of chunks into a DataFrame, so a workbook opened for streaming is not opened again.
+
+        Args:
+            chunks (Generator[List[Dict[str, Any]]]): The chunks returned by stream_data.
+
+        Returns:
+            pd.DataFrame: The data in the tab, with one column for each column that was streamed.
+            List[str]: ["Empty Tab"] if the tab has no rows.
+        """
+        with metrics.span("excel_parse"):
+            df = pd.DataFrame([row for chunk in chunks for row in chunk], columns=list(self.columns) if self.columns else None)
+
+        if df.empty:
+            return ["Empty Tab"]
+
+        self.frame = df
+        return self.frame
+
+
+
+    def iter_chunks(self, workbook, rows, positions, chunk_size):
+        """Yields the rows of the specified tab in fixed size chunks, then closes the workbook.
+
+        Args:
+            workbook (openpyxl.Workbook): The workbook, opened in read-only mode.
+            rows (Iterator[tuple]): The values of the rows after the header row.
+            positions (Dict[str, int]): The names of the columns to read and their positions in each row.
+            chunk_size (int): The number of rows in each chunk.
+
+        Yields:
+            List[Dict[str, Any]]: The next chunk of rows, where each row is a dictionary of column names and values.
+        """
+        try:
+            rows = iter(rows)
+            while True:
+                # - Only the time spent reading is timed, not the time the caller spends on each chunk
+                with metrics.span("excel_parse"):
+                    chunk = []
+                    for values in rows:
+                        # Read-only worksheets can report formatted rows that have no values
+                        if all(value is None for value in values):
+                            continue
+
+                        row = {name: values[position] if position < len(values) else None for name, position in positions.items()}
+
+                        chunk.append(row)
+                        if len(chunk) == chunk_size:
+                            break
+
+                if not chunk:
+                    return
+
+                yield chunk
+
+        finally:
+            workbook.close()
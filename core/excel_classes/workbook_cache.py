@@ -0,0 +1,120 @@
+import hashlib
+import os
+import pandas as pd
+from ..config import settings
+
+
+class WorkbookCache:
+    """Caches the parsed data of workbook tabs as pickled DataFrames, so an unchanged workbook is not parsed again.
+
+    Each entry is keyed by the workbook's path, size, modified time and a hash of its contents, along with the tab
+    and columns that were read. When the cache takes up more than max_bytes, the least recently used entries are removed.
+
+    Args:
+        directory (str, optional): The folder the entries are saved in. Defaults to the workbooks folder in settings.CACHE_DIR.
+        max_bytes (int, optional): The largest total size of the cache. Defaults to settings.WORKBOOK_CACHE_MAX_MB.
+    """
+
+    # - Bump this when the format of the cached data changes
+    FORMAT_VERSION = 1
+
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = directory or os.path.join(settings.CACHE_DIR, "workbooks")
+        self.max_bytes = max_bytes or settings.WORKBOOK_CACHE_MAX_MB * 1024 * 1024
+
+
+    def key(self, file_path, tab_name, columns=None):
+        """Builds the cache key of a workbook tab.
+
+        Args:
+            file_path (str): The path of the workbook.
+            tab_name (str): The name of the tab that is read.
+            columns (dict, optional): The names and dtypes of the columns that are read.
+
+        Returns:
+            str: The cache key.
+        """
+        stat = os.stat(file_path)
+
+        content_hash = hashlib.blake2b(digest_size=16)
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                content_hash.update(block)
+
+        identity = repr((
+            self.FORMAT_VERSION,
+            os.path.abspath(file_path),
+            stat.st_size,
+            stat.st_mtime_ns,
+            content_hash.hexdigest(),
+            tab_name,
+            columns,
+        ))
+        return hashlib.blake2b(identity.encode(), digest_size=16).hexdigest()
+
+
+    def path(self, key):
+        """Returns the path of the file an entry is saved in.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            str: The path of the entry.
+        """
+        return os.path.join(self.directory, f"{key}.pkl")
+
+
+    def load(self, key):
+        """Loads a cached DataFrame.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            pd.DataFrame: The cached data, or None if the key is not cached or the entry cannot be read.
+        """
+        path = self.path(key)
+        try:
+            df = pd.read_pickle(path)
+            # - The modified time of an entry records when it was last used
+            os.utime(path)
+            return df
+        except Exception:
+            return None
+
+
+    def save(self, key, df):
+        """Saves a DataFrame to the cache and evicts entries if the cache is too large.
+
+        Args:
+            key (str): The cache key.
+            df (pd.DataFrame): The parsed data.
+        """
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+
+            # - Write to a temporary file first so a crash cannot leave a half written entry behind
+            temp_path = f"{self.path(key)}.tmp"
+            df.to_pickle(temp_path)
+            os.replace(temp_path, self.path(key))
+
+            self.evict()
+        except OSError as e:
+            print(f"Could not write to the workbook cache: {e}")
+
+
+    def evict(self):
+        """Removes the least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".pkl"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
@@ -0,0 +1,67 @@
+import threading
+
+
+# - The events a background task posts back to its window
+PROGRESS_EVENT = "-PROGRESS-"
+DONE_EVENT = "-DONE-"
+ERROR_EVENT = "-ERROR-"
+
+
+def run_in_background(window, function, *args, **kwargs):
+    """
+    Runs a function on a worker thread so the window keeps responding while it runs.
+
+    When the function returns, a DONE_EVENT is posted to the window with its result as the event's value.
+    If it raises an exception, an ERROR_EVENT is posted with the exception instead.
+
+    Args:
+        window (sg.Window): The window the events are posted to.
+        function (function): The function to run.
+        *args: The positional arguments for the function.
+        **kwargs: The keyword arguments for the function.
+
+    Returns:
+        threading.Thread: The worker thread.
+    """
+    def worker():
+        try:
+            result = function(*args, **kwargs)
+        except Exception as e:
+            post_event(window, ERROR_EVENT, e)
+            return
+
+        post_event(window, DONE_EVENT, result)
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    return thread
+
+
+def post_event(window, key, value):
+    """
+    Posts an event to a window from a worker thread, unless the window has been closed.
+
+    Args:
+        window (sg.Window): The window the event is posted to.
+        key (str): The key of the event.
+        value (Any): The value of the event.
+    """
+    if not window.was_closed():
+        window.write_event_value(key, value)
+
+
+def format_progress(counts):
+    """
+    Describes the progress of an import or update for the status line of a window.
+
+    Args:
+        counts (dict): The counters returned by Progress.counts.
+
+    Returns:
+        str: The progress message.
+    """
+    return (
+        f"Rows read: {counts['rows_parsed']}    "
+        f"Batches sent: {counts['batches_sent']}    "
+        f"Batches remaining: {counts['batches_remaining']}"
+    )
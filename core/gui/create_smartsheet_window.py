@@ -1,11 +1,30 @@
-from ..smartsheet_functions.create_new_sheet import create_new_smartsheet
+from ..metrics import metrics
+from .background_task import DONE_EVENT, ERROR_EVENT, run_in_background
 import PySimpleGUI as sg
 
 
+def create_sheet(sheet_name):
+    """
+    Creates a new Smartsheet. The Smartsheet SDK is imported the first time a sheet is created, on the background thread,
+    so it does not slow down opening the window.
+
+    Args:
+        sheet_name (str): The name of the new Smartsheet.
+
+    Returns:
+        Sheet: The new sheet, or None if it could not be created.
+    """
+    from ..smartsheet_functions.create_new_sheet import create_new_smartsheet
+
+    return create_new_smartsheet(sheet_name)
+
+
 def create_new_smartsheet_window():
     """
     Display a window for creating a new Smartsheet and process the user input for creating a new sheet.
 
+    The sheet is created on a background thread, so the window keeps responding while Smartsheet copies the template.
+
     Returns:
         None
 
@@ -38,10 +57,11 @@ def create_new_smartsheet_window():
             ),
             sg.Cancel(font=("any 10 bold"), s=10, pad=((5, 5), (20, 0))),
         ],
+        [sg.T("", k="-STATUS-", font=("any 9"), expand_x=True, pad=((30, 30), (10, 0)))],
     ]
 
     # create the new Smartsheet window
-    window = sg.Window("New Smartsheet", layout, finalize=True, size=(400, 200))
+    window = sg.Window("New Smartsheet", layout, finalize=True, size=(400, 230))
 
     window["-CREATE-"].set_cursor(cursor="hand2")
     window["Cancel"].set_cursor(cursor="hand2")
@@ -61,8 +81,27 @@ def create_new_smartsheet_window():
                     window.close()
                     break
 
-                create_new_smartsheet(new_sheet_name)
+                window["-CREATE-"].update(disabled=True)
+                window["-STATUS-"].update("Creating the Smartsheet...")
+                metrics.reset()
+                run_in_background(window, create_sheet, new_sheet_name)
+
+            elif event == ERROR_EVENT:
+                metrics.export("-NEW-")
+                raise values[event]
+
+            elif event == DONE_EVENT:
+                metrics.export("-NEW-")
                 window.close()
+
+                # - create_new_smartsheet returns None instead of raising when the sheet could not be created
+                if values[event] is None:
+                    sg.popup_error(
+                        f"Error: The Smartsheet '{new_sheet_name}' could not be created.\n\nPlease check your connection and settings, then try again.",
+                        title="Create Failed",
+                    )
+                    return
+
                 sg.popup_auto_close(
                     "Successfully created a new Smartsheet!",
                     title="Success",
@@ -1,9 +1,15 @@
+from ..metrics import metrics
+from ..smartsheet_classes.progress import OperationCancelled, Progress
+from .background_task import DONE_EVENT, ERROR_EVENT, PROGRESS_EVENT, format_progress, post_event, run_in_background
 import PySimpleGUI as sg
 
 
 def import_sheet_window(btn, import_function, option):
     """
     Display an import sheet window and process the user input for importing or updating data in Smartsheets.
+
+    The import runs on a background thread, so the window keeps responding and shows the rows read and the
+    batches sent and remaining. The Cancel button stops a running import before its next batch.
     Args:
         btn (str): The button name indicating whether the user wants to import or update data in Smartsheets.
         import_function (function): The function that performs the import or update operation.
@@ -47,6 +53,15 @@ def import_sheet_window(btn, import_function, option):
         [sg.Frame(f"Excel File: {btn}", frame_layout, font="Any 16", expand_x=True)],
         [
             sg.Push(),
+            sg.B(
+                "Preview",
+                k="preview",
+                font=("any 10 bold"),
+                enable_events=True,
+                visible=btn == "Update",
+                pad=((0, 5), (10, 0)),
+                size=(10, 1)
+            ),
             sg.B(
                 btn,
                 k=btn.lower(),
@@ -57,37 +72,90 @@ def import_sheet_window(btn, import_function, option):
             ),
             sg.Cancel(s=15, font=("any 10 bold"), pad=((5, 5), (10, 0))),
         ],
+        [sg.T("", k="-STATUS-", font=("any 9"), expand_x=True, pad=((30, 30), (10, 0)))],
     ]
     # create the import sheet window
     window = sg.Window(
-        f"Smartsheet Data: {btn}", layout, finalize=True, size=(450, 250)
+        f"Smartsheet Data: {btn}", layout, finalize=True, size=(450, 280)
     )
 
     window["Browse"].set_cursor(cursor="hand2")
     window[f"{btn.lower()}"].set_cursor(cursor="hand2")
     window["Cancel"].set_cursor(cursor="hand2")
+    window["preview"].set_cursor(cursor="hand2")
+
+    # - The progress of the import running in the background, or None while nothing is running
+    progress = None
 
     # event loop for the import sheet window
     while True:
         event, values = window.read()
-        if event in (sg.WIN_CLOSED, "Cancel"):
-            window.close()
+        if event == sg.WIN_CLOSED:
+            if progress is not None:
+                progress.cancel()
             break
 
-        elif event == btn.lower():
-            try:
-                input_file_path = values["-ATTACHMENT-"]
-                selected_smartsheet_name = values["-SHEET NAME-"]
+        elif event == "Cancel":
+            # - Cancelling a running import stops it before its next batch instead of closing the window
+            if progress is not None:
+                progress.cancel()
+                window["-STATUS-"].update("Cancelling once the batches being sent have finished...")
+                continue
 
-                if not input_file_path or not selected_smartsheet_name:
-                    window.disappear()
-                    sg.popup_error("Form is missing data.")
-                    window.reappear()
-                    break
+            window.close()
+            break
+
+        elif event in (btn.lower(), "preview") and progress is None:
+            input_file_path = values["-ATTACHMENT-"]
+            selected_smartsheet_name = values["-SHEET NAME-"]
+
+            if not input_file_path or not selected_smartsheet_name:
+                window.disappear()
+                sg.popup_error("Form is missing data.")
+                window.reappear()
+                break
+
+            # - A preview only reports what an update would change, so the window stays open afterwards
+            progress = Progress(lambda counts: post_event(window, PROGRESS_EVENT, counts))
+            window[btn.lower()].update(disabled=True)
+            window["preview"].update(disabled=True)
+            window["-STATUS-"].update("Reading the excel file...")
+            metrics.reset()
+
+            run_in_background(
+                window,
+                import_function,
+                option,
+                input_file_path,
+                selected_smartsheet_name,
+                dry_run=event == "preview",
+                progress=progress,
+            )
 
-                import_function_results = import_function(
-                    option, input_file_path, selected_smartsheet_name
+        elif event == PROGRESS_EVENT:
+            window["-STATUS-"].update(format_progress(values[event]))
+
+        elif event in (DONE_EVENT, ERROR_EVENT):
+            progress = None
+            metrics.export(option)
+            window[btn.lower()].update(disabled=False)
+            window["preview"].update(disabled=False)
+            window["-STATUS-"].update("")
+
+            if isinstance(values[event], OperationCancelled):
+                window.disappear()
+                sg.popup_ok(
+                    f"The {btn.lower()} was cancelled. The rows that were already sent have been kept in the smartsheet.\n\n{values[event]}",
+                    title="Cancelled",
                 )
+                window.reappear()
+                continue
+
+            try:
+                if event == ERROR_EVENT:
+                    raise values[event]
+
+                import_function_results = values[event]
                 error_list = None
                 import_key = import_function_results[0]
 
@@ -96,14 +164,27 @@ def import_sheet_window(btn, import_function, option):
                     error_list = ", ".join(import_function_results[1])
 
                 error_messages = {
-                    "Duplicates Found": f"Error: Could not import data from the excel file to smartsheets due to matching Item IDs in both sheets.\n\nDuplicate Item IDs: \n\n{error_list}",
+                    "Duplicates Found": f"Error: Could not import data from the excel file to smartsheets due to Item IDs that are repeated in the excel file or already in the smartsheet.\n\nDuplicate Item IDs: \n\n{error_list}",
                     "Empty Tab": f"Error: The Purchasing_Items tab in your excel document is empty.",
                     "Incorrect Format": f"Error: The excel file you provided could not be imported due to having the incorrect format.",
                     "Incorrect Tab Name": f"Error: \n\nPlease ensure that the primary tab in your attached excel file is named 'Purchasing_Items'. Other tabs will not be read. \n\nExcel file you uploaded: \n\n'{input_file_path}'",
+                    "Missing Columns": f"Error: The Purchasing_Items tab in your excel document is missing columns that are needed for the import.\n\nMissing columns: \n\n{error_list}",
                     "Invalid ID": f"Smartsheet named '{selected_smartsheet_name}' could not be found. Please make sure you type in the exact name of the Smartsheet.",
                     "No Differences": f"There were no differences found when comparing the data in the excel file and the smartsheet. \n\nExcel file you uploaded: \n\n'{input_file_path}'",
+                    "Write Failed": f"Error: Some of the rows could not be written to the smartsheet.\n\nFailed batches: \n\n{error_list}",
+                    "Partial Write": f"Error: The import stopped part way through because a value in the excel file could not be read. The rows that were already added have been kept in the smartsheet.\n\n{error_list}",
                 }
 
+                if import_key == "Dry Run":
+                    window.disappear()
+                    sg.popup_ok(
+                        "Updating your Smartsheet with this excel file will make these changes:\n\n"
+                        + "\n".join(import_function_results[1]),
+                        title="Preview",
+                    )
+                    window.reappear()
+                    continue
+
                 if import_key in error_messages:
                     window.disappear()
                     sg.popup_ok(error_messages.get(import_key), title=import_key)
@@ -133,5 +214,6 @@ def import_sheet_window(btn, import_function, option):
                     wait=True,
                 )
                 sg.popup_error_with_traceback("Problem in my event loop!")
+                break
 
     window.close()
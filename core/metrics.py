@@ -0,0 +1,143 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from .config import settings
+
+
+class RunMetrics:
+    """Collects the timings and API counters of a run, so a slow import shows where it spent its time.
+
+    Each phase of a run (reading the Excel file, finding the sheet, fetching its columns and data, comparing,
+    writing batches) is timed with a span. Spans can be nested and run on several threads at once, so the phase
+    totals can add up to more than the run's duration. The counters record the API calls, bytes sent and
+    received, retries and the time spent waiting for the rate limit.
+
+    The results can be exported as a JSON run report and as Prometheus text.
+    """
+
+    # - The counters every report contains, even when they are zero
+    COUNTERS = ["api_calls", "retries", "rate_limit_wait_seconds", "bytes_sent", "bytes_received"]
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+
+    def reset(self):
+        """Clears the spans and counters and starts a new run."""
+        with self.lock:
+            self.started_at = time.time()
+            self.counters = dict.fromkeys(self.COUNTERS, 0)
+            self.phases = {}
+
+
+    @contextmanager
+    def span(self, phase):
+        """Times a phase of the run.
+
+        Args:
+            phase (str): The name of the phase.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            with self.lock:
+                record = self.phases.setdefault(phase, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+                record["count"] += 1
+                record["total_seconds"] += duration
+                record["max_seconds"] = max(record["max_seconds"], duration)
+
+
+    def add(self, counter, value=1):
+        """Adds to a counter.
+
+        Args:
+            counter (str): The name of the counter.
+            value (int or float, optional): The amount to add.
+        """
+        with self.lock:
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+
+    def report(self, label=None):
+        """Builds the run report.
+
+        Args:
+            label (str, optional): A name for the run, such as the operation that was run.
+
+        Returns:
+            dict: The start time and duration of the run, the timings of each phase, and the counters.
+        """
+        with self.lock:
+            return {
+                "label": label,
+                "started_at": datetime.fromtimestamp(self.started_at).isoformat(timespec="seconds"),
+                "duration_seconds": round(time.time() - self.started_at, 3),
+                "phases": {
+                    phase: {**record, "total_seconds": round(record["total_seconds"], 3), "max_seconds": round(record["max_seconds"], 3)}
+                    for phase, record in self.phases.items()
+                },
+                "counters": dict(self.counters),
+            }
+
+
+    def prometheus(self):
+        """Formats the spans and counters in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics as Prometheus text.
+        """
+        with self.lock:
+            lines = [
+                "# HELP smartsheet_phase_seconds_total Time spent in each phase of the run.",
+                "# TYPE smartsheet_phase_seconds_total counter",
+            ]
+            lines += [f'smartsheet_phase_seconds_total{{phase="{phase}"}} {record["total_seconds"]}' for phase, record in self.phases.items()]
+            lines += [
+                "# HELP smartsheet_phase_runs_total Number of times each phase ran.",
+                "# TYPE smartsheet_phase_runs_total counter",
+            ]
+            lines += [f'smartsheet_phase_runs_total{{phase="{phase}"}} {record["count"]}' for phase, record in self.phases.items()]
+            for counter, value in self.counters.items():
+                lines += [f"# TYPE smartsheet_{counter}_total counter", f"smartsheet_{counter}_total {value}"]
+
+        return "\n".join(lines) + "\n"
+
+
+    def export(self, label=None):
+        """Writes the run report to settings.REPORT_DIR and the Prometheus text to settings.PROMETHEUS_FILE, if they are set.
+
+        Args:
+            label (str, optional): A name for the run, such as the operation that was run.
+
+        Returns:
+            dict: The run report.
+        """
+        report = self.report(label)
+
+        try:
+            if settings.REPORT_DIR:
+                os.makedirs(settings.REPORT_DIR, exist_ok=True)
+                file_name = f"run-{datetime.now():%Y%m%d-%H%M%S}.json"
+                with open(os.path.join(settings.REPORT_DIR, file_name), "w") as f:
+                    json.dump(report, f, indent=2)
+
+            if settings.PROMETHEUS_FILE:
+                # - Write to a temporary file first so a scraper never reads a half written file
+                temp_path = f"{settings.PROMETHEUS_FILE}.tmp"
+                with open(temp_path, "w") as f:
+                    f.write(self.prometheus())
+                os.replace(temp_path, settings.PROMETHEUS_FILE)
+        except OSError as e:
+            print(f"Could not write the run report: {e}")
+
+        return report
+
+
+# - The metrics of the current run, shared by every module
+metrics = RunMetrics()
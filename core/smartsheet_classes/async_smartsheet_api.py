@@ -0,0 +1,233 @@
+import asyncio
+import json
+from ..config import settings
+from ..metrics import metrics
+from .request_scheduler import RequestScheduler
+
+
+class SmartsheetRequestError(Exception):
+    """Raised when the Smartsheet REST API returns an error response.
+
+    Args:
+        status (int): The HTTP status code of the response.
+        message (str): The error message returned by Smartsheet.
+        code (int, optional): The Smartsheet error code.
+        headers (dict, optional): The response headers, used to read Retry-After.
+    """
+
+    def __init__(self, status, message, code=None, headers=None):
+        super().__init__(f"{status} - {message}")
+        self.status = status
+        self.code = code
+        self.headers = headers or {}
+
+
+class AsyncSmartSheetApi:
+    """An asyncio version of SmartSheetApi that talks to the Smartsheet REST API with aiohttp.
+
+    Requests made from the same event loop overlap their network latency, so work across several sheets
+    (listing a workspace, fetching several sheets) runs concurrently. Every request goes through the
+    same rate limit as the synchronous SmartSheetApi. Sheets and rows are plain dictionaries in the API's JSON format.
+
+    The object must be used as an async context manager so its connection pool is closed:
+
+        async with AsyncSmartSheetApi(api_key, workspace_id=workspace_id) as api:
+            sheets = await api.get_sheets(sheet_ids)
+
+    Args:
+        api_key (str): The API key used to authenticate the requests.
+        folder_id (int, optional): The ID of the folder to work in.
+        workspace_id (int, optional): The ID of the workspace to work in.
+    """
+
+    def __init__(self, api_key, folder_id = None, workspace_id = None):
+        self.api_key = api_key
+        self.base_url = settings.SMARTSHEET_API_BASE.rstrip("/")
+        self.folder_id = folder_id
+        self.scheduler = RequestScheduler(api_key)
+        self.session = None
+        self.workspace_id = workspace_id
+
+
+    async def __aenter__(self):
+        # - aiohttp is only needed once the async engine is used, so it is not imported with the module
+        import aiohttp
+
+        self.session = aiohttp.ClientSession(
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Accept-Encoding": "gzip, deflate",
+            },
+            connector=aiohttp.TCPConnector(limit=settings.MAX_CONNECTIONS),
+        )
+        return self
+
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+
+    async def request(self, method, path, params=None, json=None):
+        """Sends a request through the rate limit, retrying it if it is throttled.
+
+        Args:
+            method (str): The HTTP method.
+            path (str): The path of the endpoint, relative to the API root.
+            params (dict, optional): The query string parameters.
+            json (dict or list, optional): The request body.
+
+        Returns:
+            dict: The decoded JSON response.
+        """
+        return await self.scheduler.call_async(self.send, method, path, params, json)
+
+
+    async def send(self, method, path, params=None, body=None):
+        """Sends a single request to the Smartsheet REST API.
+
+        Args:
+            method (str): The HTTP method.
+            path (str): The path of the endpoint, relative to the API root.
+            params (dict, optional): The query string parameters.
+            body (dict or list, optional): The request body.
+
+        Returns:
+            dict: The decoded JSON response.
+
+        Raises:
+            SmartsheetRequestError: If Smartsheet returns an error response.
+        """
+        data = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json"} if data is not None else None
+
+        async with self.session.request(method, f"{self.base_url}/{path}", params=params, data=data, headers=headers) as response:
+            content = await response.read()
+            metrics.add("bytes_sent", len(data or b""))
+            metrics.add("bytes_received", len(content))
+            result = json.loads(content) if content else None
+
+            if response.status >= 400:
+                result = result or {}
+                raise SmartsheetRequestError(
+                    response.status, result.get("message"), result.get("errorCode"), dict(response.headers)
+                )
+
+            return result
+
+
+    async def get_sheets_in_folder(self, folder_id=None):
+        """Returns the names and IDs of all sheets within a folder.
+
+        Args:
+            folder_id (int, optional): The ID of the folder. Defaults to folder_id.
+
+        Returns:
+            list: A list of dictionaries, where each dictionary contains the name and ID of a sheet.
+        """
+        folder = await self.request("GET", f"folders/{folder_id or self.folder_id}")
+        return [{"name": sheet["name"], "id": sheet["id"]} for sheet in folder.get("sheets", [])]
+
+
+    async def get_sheets_in_workspace(self, workspace_id=None):
+        """Returns the names and IDs of all sheets within a workspace.
+
+        Args:
+            workspace_id (int, optional): The ID of the workspace. Defaults to workspace_id.
+
+        Returns:
+            list: A list of dictionaries, where each dictionary contains the name and ID of a sheet.
+        """
+        workspace = await self.request("GET", f"workspaces/{workspace_id or self.workspace_id}")
+        return [{"name": sheet["name"], "id": sheet["id"]} for sheet in workspace.get("sheets", [])]
+
+
+    async def get_sheet(self, sheet_id, column_ids=None):
+        """Gets a sheet.
+
+        Args:
+            sheet_id (int): The ID of the sheet.
+            column_ids (list, optional): The IDs of the columns to download. Defaults to every column.
+
+        Returns:
+            dict: The sheet in the API's JSON format.
+        """
+        params = {"columnIds": ",".join(str(column_id) for column_id in column_ids)} if column_ids else None
+        return await self.request("GET", f"sheets/{sheet_id}", params=params)
+
+
+    async def get_sheets(self, sheet_ids, column_ids=None):
+        """Gets several sheets at the same time.
+
+        Args:
+            sheet_ids (list): The IDs of the sheets.
+            column_ids (list, optional): The IDs of the columns to download from every sheet. Defaults to every column.
+
+        Returns:
+            list: The sheets in the API's JSON format, in the same order as sheet_ids.
+        """
+        return await asyncio.gather(*(self.get_sheet(sheet_id, column_ids) for sheet_id in sheet_ids))
+
+
+    async def create_sheet_in_workspace(self, template_sheet_id, new_sheet_name, workspace_id=None):
+        """Creates a new sheet in a workspace from a template.
+
+        Args:
+            template_sheet_id (int): The ID of the template sheet to use.
+            new_sheet_name (str): The name of the new sheet.
+            workspace_id (int, optional): The ID of the workspace. Defaults to workspace_id.
+
+        Returns:
+            dict: The new sheet that was created.
+        """
+        response = await self.request(
+            "POST",
+            f"workspaces/{workspace_id or self.workspace_id}/sheets",
+            json={"name": new_sheet_name, "fromId": int(template_sheet_id)},
+        )
+        return response.get("result")
+
+
+    async def add_rows(self, sheet_id, rows):
+        """Adds rows to a sheet.
+
+        Args:
+            sheet_id (int): The ID of the sheet.
+            rows (list): The rows to add, in the API's JSON format.
+
+        Returns:
+            list: The added rows.
+        """
+        response = await self.request("POST", f"sheets/{sheet_id}/rows", json=rows)
+        return response.get("result")
+
+
+    async def update_rows(self, sheet_id, rows):
+        """Updates rows in a sheet.
+
+        Args:
+            sheet_id (int): The ID of the sheet.
+            rows (list): The partial rows to update, in the API's JSON format.
+
+        Returns:
+            list: The updated rows.
+        """
+        response = await self.request("PUT", f"sheets/{sheet_id}/rows", json=rows)
+        return response.get("result")
+
+
+    async def delete_rows(self, sheet_id, row_ids):
+        """Deletes rows from a sheet.
+
+        Args:
+            sheet_id (int): The ID of the sheet.
+            row_ids (list): The IDs of the rows to delete.
+
+        Returns:
+            list: The IDs of the deleted rows.
+        """
+        response = await self.request(
+            "DELETE",
+            f"sheets/{sheet_id}/rows",
+            params={"ids": ",".join(str(row_id) for row_id in row_ids), "ignoreRowsNotFound": "true"},
+        )
+        return response.get("result")
@@ -0,0 +1,144 @@
+import math
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from ..config import settings
+from ..metrics import metrics
+from .progress import Progress
+
+
+BatchResult = namedtuple("BatchResult", ["index", "size", "result", "error"])
+
+
+class BulkWriter:
+    """Sends bulk row operations to a sheet in batches.
+
+    The rows are split into batches of batch_size and the batches are sent from a thread pool, so a large
+    import does not hit the API's per-request limits and one failed batch does not fail the whole write.
+    Every batch is counted in the progress, and a cancelled write stops before its next batch.
+
+    Args:
+        smartsheet_client (SmartsheetClient): The Smartsheet client used to send the requests.
+        scheduler (RequestScheduler): The scheduler the API calls are sent through.
+        batch_size (int, optional): The number of rows in each batch. Defaults to settings.BATCH_SIZE.
+        max_workers (int, optional): The number of batches that can be sent at the same time. Defaults to settings.MAX_WORKERS.
+        progress (Progress, optional): The progress the batches are counted in, which is also checked for cancellation.
+    """
+
+    # - Row IDs to delete are sent in the query string, so delete batches are kept small
+    MAX_DELETE_BATCH_SIZE = 100
+
+    def __init__(self, smartsheet_client, scheduler, batch_size=None, max_workers=None, progress=None):
+        self.smartsheet_client = smartsheet_client
+        self.progress = progress or Progress()
+        self.scheduler = scheduler
+        self.batch_size = batch_size or settings.BATCH_SIZE
+        self.max_workers = max_workers or settings.MAX_WORKERS
+
+
+    def batches(self, items, batch_size=None):
+        """Splits the items into batches.
+
+        Args:
+            items (iterable): The rows or row IDs to split.
+            batch_size (int, optional): The number of items in each batch. Defaults to batch_size.
+
+        Yields:
+            list: The next batch of items.
+        """
+        iterator = iter(items)
+        batch_size = batch_size or self.batch_size
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                return
+            yield batch
+
+
+    def write(self, sheet_id, operation, items, ordered=False):
+        """Sends the items to the sheet in batches.
+
+        Args:
+            sheet_id (int): The ID of the sheet to write to.
+            operation (str): The bulk operation to run. Possible values are: "add", "update", "delete".
+            items (iterable): The Row objects to add or update, or the row IDs to delete. If items is a generator,
+                batches are sent while it is still producing items, and it is paused while too many batches are waiting.
+            ordered (bool, optional): True if the batches must be applied in order, for example when rows are added
+                to the bottom of the sheet. Ordered batches are sent one at a time.
+
+        Returns:
+            List[BatchResult]: The result of each batch, in the order the batches were created.
+
+        Raises:
+            OperationCancelled: If the progress is cancelled. The batches already in flight are finished first.
+        """
+        batch_size = min(self.batch_size, self.MAX_DELETE_BATCH_SIZE) if operation == "delete" else self.batch_size
+        max_workers = 1 if ordered else self.max_workers
+
+        # - The number of batches is only known up front when the items are not a generator
+        sized = hasattr(items, "__len__")
+        if sized:
+            self.progress.add_batches(math.ceil(len(items) / batch_size))
+
+        futures = []
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for index, batch in enumerate(self.batches(items, batch_size)):
+                # - Wait for the oldest batch so only a few batches are held in memory at once
+                if len(pending) >= max_workers * 2:
+                    pending.popleft().result()
+
+                self.progress.check()
+                if not sized:
+                    self.progress.add_batches(1)
+
+                future = executor.submit(self.send_batch, sheet_id, operation, index, batch)
+                futures.append(future)
+                pending.append(future)
+
+        return [future.result() for future in futures]
+
+
+    def send_batch(self, sheet_id, operation, index, batch):
+        """Sends a single batch to the sheet.
+
+        Args:
+            sheet_id (int): The ID of the sheet to write to.
+            operation (str): The bulk operation to run. Possible values are: "add", "update", "delete".
+            index (int): The position of the batch in the write.
+            batch (list): The Row objects or row IDs in the batch.
+
+        Returns:
+            BatchResult: The result of the batch. If the request failed, error contains the exception.
+        """
+        try:
+            with metrics.span("write_batch"):
+                if operation == "add":
+                    result = self.scheduler.call(self.smartsheet_client.Sheets.add_rows, sheet_id, batch)
+                elif operation == "update":
+                    result = self.scheduler.call(self.smartsheet_client.Sheets.update_rows, sheet_id, batch)
+                elif operation == "delete":
+                    result = self.scheduler.call(self.smartsheet_client.Sheets.delete_rows, sheet_id, batch, ignore_rows_not_found=True)
+                else:
+                    raise ValueError(f"Unknown bulk operation: {operation}")
+
+            return BatchResult(index, len(batch), result, None)
+
+        except Exception as e:
+            return BatchResult(index, len(batch), None, e)
+
+        finally:
+            self.progress.batch_sent()
+
+
+    @staticmethod
+    def errors(results):
+        """Describes the batches that failed.
+
+        Args:
+            results (List[BatchResult]): The results returned by write.
+
+        Returns:
+            List[str]: A message for each failed batch.
+        """
+        return [f"Batch {result.index + 1} ({result.size} rows): {result.error}" for result in results if result.error]
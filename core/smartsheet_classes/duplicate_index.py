@@ -0,0 +1,90 @@
+class DuplicateIndex:
+    """Finds the duplicate keys within the workbook, within the sheet and across the two, in one pass over each.
+
+    The keys are held in sets, so checking a value against the duplicates does not depend on how many there are.
+    The same index is used to refuse an import, to mark the duplicates of an import with duplicates, and to pick
+    the rows that are highlighted afterwards.
+
+    Attributes:
+        workbook (set): The keys repeated within the workbook.
+        sheet (set): The keys repeated within the sheet.
+        cross (set): The keys found in both the workbook and the sheet.
+        added (set): The keys that adding the workbook to the sheet would duplicate.
+        keys (set): Every duplicate key.
+        marked (set): The values of the duplicate keys once they are marked with MARK.
+
+    Args:
+        excel_keys (iterable): The key of every Excel row, including repeated keys.
+        sheet_keys (dict): The key of every sheet row, keyed by row ID.
+    """
+
+    # - Added to duplicate values so they can be told apart in the sheet
+    MARK = " - duplicate"
+
+    def __init__(self, excel_keys, sheet_keys):
+        self.workbook, excel_seen = self.repeated(excel_keys)
+        self.sheet, sheet_seen = self.repeated(sheet_keys.values())
+        self.cross = excel_seen & sheet_seen
+        self.added = self.workbook | self.cross
+        self.keys = self.added | self.sheet
+        self.marked = {f"{key}{self.MARK}" for key in self.added}
+
+
+    def __contains__(self, value):
+        return value in self.added
+
+
+    @staticmethod
+    def repeated(keys):
+        """Finds the keys that appear more than once.
+
+        Args:
+            keys (iterable): The keys to check. Empty keys are skipped.
+
+        Returns:
+            Tuple[set, set]: The keys that appear more than once, and every key.
+        """
+        seen = set()
+        repeated = set()
+        for key in keys:
+            if key is None:
+                continue
+            if key in seen:
+                repeated.add(key)
+            else:
+                seen.add(key)
+
+        return repeated, seen
+
+
+    def mark(self, value):
+        """Marks a value if adding it to the sheet would duplicate a key.
+
+        Args:
+            value (Any): The value of a cell.
+
+        Returns:
+            Any: The value with MARK added to it if it is a duplicate key, otherwise the value.
+        """
+        return f"{value}{self.MARK}" if value in self.added else value
+
+
+    def row_ids(self, sheet_keys):
+        """Finds the sheet rows whose keys are duplicates, including keys that have been marked.
+
+        Args:
+            sheet_keys (dict): The key of every sheet row, keyed by row ID.
+
+        Returns:
+            list: The IDs of the rows with duplicate keys.
+        """
+        return [row_id for row_id, key in sheet_keys.items() if key in self.keys or key in self.marked]
+
+
+    def report(self):
+        """Lists the keys that adding the workbook to the sheet would duplicate.
+
+        Returns:
+            List[str]: The duplicate keys, sorted.
+        """
+        return sorted(str(key) for key in self.added)
@@ -0,0 +1,94 @@
+import threading
+
+
+class OperationCancelled(Exception):
+    """Raised when an import or update is cancelled. The batches already sent are kept."""
+
+
+class Progress:
+    """Counts the rows read and batches sent by an import or update, and lets it be cancelled between batches.
+
+    The counters are updated from the worker threads that send the batches. Every change is passed to the
+    callback, which the GUI uses to post a progress event back to its window.
+
+    Args:
+        callback (callable, optional): Called with the dictionary returned by counts every time a counter changes.
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.cancel_event = threading.Event()
+        self.rows_parsed = 0
+        self.batches_sent = 0
+        self.batches_total = 0
+        self.lock = threading.Lock()
+
+
+    @property
+    def cancelled(self):
+        """bool: True if the operation has been cancelled."""
+        return self.cancel_event.is_set()
+
+
+    def cancel(self):
+        """Asks the operation to stop before it sends its next batch."""
+        self.cancel_event.set()
+
+
+    def check(self):
+        """Stops the operation if it has been cancelled.
+
+        Raises:
+            OperationCancelled: If the operation has been cancelled.
+        """
+        if self.cancelled:
+            raise OperationCancelled(f"Cancelled after {self.batches_sent} batches were sent.")
+
+
+    def add_rows(self, count):
+        """Counts rows that have been read from the Excel file.
+
+        Args:
+            count (int): The number of rows read.
+        """
+        with self.lock:
+            self.rows_parsed += count
+        self.notify()
+
+
+    def add_batches(self, count):
+        """Counts batches that are going to be sent.
+
+        Args:
+            count (int): The number of batches.
+        """
+        with self.lock:
+            self.batches_total += count
+        self.notify()
+
+
+    def batch_sent(self):
+        """Counts a batch that has been sent, whether or not it succeeded."""
+        with self.lock:
+            self.batches_sent += 1
+        self.notify()
+
+
+    def counts(self):
+        """Gets the current counters.
+
+        Returns:
+            dict: The number of rows parsed, batches sent and batches remaining.
+        """
+        with self.lock:
+            return {
+                "rows_parsed": self.rows_parsed,
+                "batches_sent": self.batches_sent,
+                "batches_remaining": max(self.batches_total - self.batches_sent, 0),
+            }
+
+
+    def notify(self):
+        """Passes the current counters to the callback."""
+        if self.callback is not None:
+            self.callback(self.counts())
@@ -0,0 +1,293 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque, namedtuple
+from ..config import settings
+from ..metrics import metrics
+
+
+CallRecord = namedtuple("CallRecord", ["name", "wait", "attempts", "duration", "error"])
+
+# - Smartsheet error codes that are safe to retry: rate limit, sheet locked by another request, server busy
+RETRYABLE_ERROR_CODES = {4001, 4002, 4003, 4004}
+
+
+class TokenBucket:
+    """A thread safe token bucket that spreads requests evenly over a minute.
+
+    Callers reserve a token before each request and are told how long to wait for it, so callers that share the
+    bucket queue up behind each other instead of all sending at once.
+
+    Args:
+        rate_per_minute (int): The number of requests allowed per minute.
+        burst (int, optional): The number of requests that can be sent back to back when the bucket is full.
+    """
+
+    def __init__(self, rate_per_minute, burst=10):
+        self.rate = rate_per_minute / 60
+        self.capacity = burst
+        self.tokens = burst
+        self.blocked_until = 0.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+
+    def reserve(self):
+        """Reserves a token for one request.
+
+        Returns:
+            float: The number of seconds the caller must wait before sending the request.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(delay, self.blocked_until - now)
+
+
+    def pause(self, seconds):
+        """Stops every caller that shares the bucket from sending requests for a number of seconds.
+
+        Args:
+            seconds (float): How long to pause for.
+        """
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class RequestScheduler:
+    """Sends every Smartsheet API call through a rate limit shared by all users of the same access token.
+
+    Calls that are rate limited (HTTP 429) or rejected because the sheet is busy are retried with a jittered
+    exponential backoff that honours the Retry-After header when it is available. The time each call spent
+    waiting for the rate limit is recorded.
+
+    Args:
+        api_key (str): The access token the calls are made with.
+        rate_per_minute (int, optional): The number of requests allowed per minute. Defaults to settings.RATE_LIMIT.
+        max_retries (int, optional): The number of times a call is retried. Defaults to settings.MAX_RETRIES.
+        base_delay (float, optional): The first backoff delay in seconds.
+        max_delay (float, optional): The longest backoff delay in seconds.
+    """
+
+    buckets = {}
+    buckets_lock = threading.Lock()
+
+    def __init__(self, api_key, rate_per_minute=None, max_retries=None, base_delay=1.0, max_delay=60.0):
+        self.bucket = self.get_bucket(api_key, rate_per_minute or settings.RATE_LIMIT)
+        self.max_retries = settings.MAX_RETRIES if max_retries is None else max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.records = deque(maxlen=1000)
+        self.calls = 0
+        self.retries = 0
+        self.total_wait = 0.0
+        self.lock = threading.Lock()
+
+
+    @classmethod
+    def get_bucket(cls, api_key, rate_per_minute):
+        """Gets the token bucket shared by every scheduler using the same access token.
+
+        Args:
+            api_key (str): The access token.
+            rate_per_minute (int): The number of requests allowed per minute, used if the bucket is new.
+
+        Returns:
+            TokenBucket: The shared token bucket.
+        """
+        with cls.buckets_lock:
+            if api_key not in cls.buckets:
+                cls.buckets[api_key] = TokenBucket(rate_per_minute)
+            return cls.buckets[api_key]
+
+
+    def call(self, func, *args, **kwargs):
+        """Calls a Smartsheet SDK function once the rate limit allows it, retrying if it is throttled.
+
+        Args:
+            func (callable): The SDK function to call.
+            *args: The positional arguments for the function.
+            **kwargs: The keyword arguments for the function.
+
+        Returns:
+            Any: The value returned by the function.
+
+        Raises:
+            Exception: The last error raised by the function if it is not retryable or the retries ran out.
+        """
+        name = getattr(func, "__qualname__", repr(func))
+        wait = 0.0
+        attempt = 0
+
+        while True:
+            delay = self.bucket.reserve()
+            if delay > 0:
+                time.sleep(delay)
+                wait += delay
+
+            start = time.monotonic()
+            try:
+                result = self.raise_for_error(func(*args, **kwargs))
+            except Exception as e:
+                retry_after = self.retry_after(e)
+                if retry_after is None or attempt >= self.max_retries:
+                    self.record(name, wait, attempt + 1, time.monotonic() - start, e)
+                    raise
+
+                self.bucket.pause(self.backoff(attempt, retry_after))
+                attempt += 1
+                continue
+
+            self.record(name, wait, attempt + 1, time.monotonic() - start, None)
+            return result
+
+
+    async def call_async(self, func, *args, **kwargs):
+        """Awaits a coroutine function once the rate limit allows it, retrying if it is throttled.
+
+        This is the asyncio version of call. Waiting for the rate limit does not block the event loop.
+
+        Args:
+            func (coroutine function): The function that sends the request.
+            *args: The positional arguments for the function.
+            **kwargs: The keyword arguments for the function.
+
+        Returns:
+            Any: The value returned by the function.
+
+        Raises:
+            Exception: The last error raised by the function if it is not retryable or the retries ran out.
+        """
+        name = getattr(func, "__qualname__", repr(func))
+        wait = 0.0
+        attempt = 0
+
+        while True:
+            delay = self.bucket.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                wait += delay
+
+            start = time.monotonic()
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                retry_after = self.retry_after(e)
+                if retry_after is None or attempt >= self.max_retries:
+                    self.record(name, wait, attempt + 1, time.monotonic() - start, e)
+                    raise
+
+                self.bucket.pause(self.backoff(attempt, retry_after))
+                attempt += 1
+                continue
+
+            self.record(name, wait, attempt + 1, time.monotonic() - start, None)
+            return result
+
+
+    @staticmethod
+    def raise_for_error(result):
+        """Raises the error returned by an SDK call.
+
+        The client returns errors as Error objects instead of raising them, because the SDK cannot raise its
+        retryable errors itself, so they are raised here as an ApiError that retry_after can read.
+
+        Args:
+            result (Any): The value returned by the SDK function.
+
+        Returns:
+            Any: The result, if it is not an error.
+
+        Raises:
+            ApiError: If the result is an Error object.
+        """
+        from smartsheet.exceptions import ApiError
+        from smartsheet.models import Error
+
+        if isinstance(result, Error):
+            raise ApiError(result, f"{result.result.code}: {result.result.message}", result.result.should_retry)
+
+        return result
+
+
+    def backoff(self, attempt, retry_after=0.0):
+        """Works out how long to wait before retrying a call.
+
+        Args:
+            attempt (int): The number of retries made so far.
+            retry_after (float, optional): The delay requested by the server's Retry-After header.
+
+        Returns:
+            float: The number of seconds to wait.
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return max(delay, retry_after) + random.uniform(0, self.base_delay)
+
+
+    @staticmethod
+    def retry_after(error):
+        """Checks if a failed call can be retried.
+
+        Args:
+            error (Exception): The error raised by the call.
+
+        Returns:
+            float: The delay requested by the Retry-After header, or 0 if there was none.
+            None: If the error should not be retried.
+        """
+        response = getattr(error, "error", None)
+        result = getattr(response, "result", None)
+        status = getattr(result, "status_code", None) or getattr(error, "status", None)
+        code = getattr(result, "code", None) or getattr(error, "code", None)
+
+        if status != 429 and code not in RETRYABLE_ERROR_CODES and not (status and status >= 500):
+            return None
+
+        # - SDK errors keep the HTTP response they came from, the async engine's errors keep its headers
+        request_response = getattr(response, "request_response", None)
+        headers = getattr(error, "headers", None) or getattr(request_response, "headers", None) or {}
+        try:
+            return float(headers.get("Retry-After", 0))
+        except (TypeError, ValueError):
+            return 0.0
+
+
+    def record(self, name, wait, attempts, duration, error):
+        """Records the outcome of a call.
+
+        Args:
+            name (str): The name of the SDK function that was called.
+            wait (float): The number of seconds the call waited for the rate limit.
+            attempts (int): The number of times the call was sent.
+            duration (float): The number of seconds the last attempt took.
+            error (Exception): The error raised by the call, or None if it succeeded.
+        """
+        with self.lock:
+            self.records.append(CallRecord(name, wait, attempts, duration, error))
+            self.calls += attempts
+            self.retries += attempts - 1
+            self.total_wait += wait
+
+        metrics.add("api_calls", attempts)
+        metrics.add("retries", attempts - 1)
+        metrics.add("rate_limit_wait_seconds", wait)
+
+
+    def summary(self):
+        """Summarizes the calls made through the scheduler.
+
+        Returns:
+            dict: The number of calls and retries, and the total and longest rate limit wait in seconds.
+        """
+        with self.lock:
+            return {
+                "calls": self.calls,
+                "retries": self.retries,
+                "total_wait": self.total_wait,
+                "max_wait": max((record.wait for record in self.records), default=0.0),
+            }
@@ -0,0 +1,117 @@
+import threading
+import time
+from ..config import settings
+
+
+class SheetNameIndex:
+    """A name to ID index of the sheets in a folder or workspace, shared by every SmartSheetApi object in the process.
+
+    Names are looked up without regard to case, preferring a sheet whose name matches exactly. The index is
+    listed again once it is older than the TTL, or when a name is not found in it. The listing is saved to the
+    snapshot cache, so a new process starts from the last listing while it is still fresh.
+
+    Args:
+        parent_id (int): The ID of the folder or workspace.
+        store (SnapshotCache, optional): The cache the listing is saved to.
+        ttl (int, optional): The number of seconds a listing is reused. Defaults to settings.SHEET_NAME_TTL.
+    """
+
+    indexes = {}
+    indexes_lock = threading.Lock()
+
+    def __init__(self, parent_id, store=None, ttl=None):
+        self.parent_id = parent_id
+        self.store = store
+        self.ttl = settings.SHEET_NAME_TTL if ttl is None else ttl
+        self.names = {}
+        self.fetched_at = 0.0
+        self.lock = threading.Lock()
+
+        cached_sheets = store.load_sheet_names(parent_id) if store is not None else []
+        if cached_sheets:
+            self.build(cached_sheets, min(sheet["fetched_at"] for sheet in cached_sheets))
+
+
+    @classmethod
+    def shared(cls, parent_id, store=None):
+        """Gets the index shared by every caller working in the same folder or workspace.
+
+        Args:
+            parent_id (int): The ID of the folder or workspace.
+            store (SnapshotCache, optional): The cache the listing is saved to, used if the index is new.
+
+        Returns:
+            SheetNameIndex: The shared index.
+        """
+        with cls.indexes_lock:
+            if parent_id not in cls.indexes:
+                cls.indexes[parent_id] = cls(parent_id, store)
+            return cls.indexes[parent_id]
+
+
+    def build(self, sheets, fetched_at):
+        """Replaces the index with a new listing.
+
+        Args:
+            sheets (list): A list of dictionaries, where each dictionary contains the name and ID of a sheet.
+            fetched_at (float): The time the sheets were listed.
+        """
+        names = {}
+        for sheet in sheets:
+            names.setdefault(sheet["name"].casefold(), []).append(sheet)
+
+        self.names = names
+        self.fetched_at = fetched_at
+
+
+    def refresh(self, list_sheets):
+        """Lists the sheets again and saves the listing.
+
+        Args:
+            list_sheets (callable): A function that returns the names and IDs of the sheets in the folder or workspace.
+        """
+        sheets = list_sheets()
+        self.build(sheets, time.time())
+        if self.store is not None:
+            self.store.save_sheet_names(self.parent_id, sheets)
+
+
+    def find(self, name):
+        """Finds the ID of a sheet in the index.
+
+        Args:
+            name (str): The name of the sheet.
+
+        Returns:
+            int: The ID of the sheet, or None if it is not in the index.
+        """
+        sheets = self.names.get(name.casefold())
+        if not sheets:
+            return None
+
+        sheet = next((sheet for sheet in sheets if sheet["name"] == name), sheets[0])
+        return sheet["id"]
+
+
+    def lookup(self, name, list_sheets):
+        """Gets the ID of a sheet by its name, listing the sheets again if the index is too old or the name is missing.
+
+        Args:
+            name (str): The name of the sheet.
+            list_sheets (callable): A function that returns the names and IDs of the sheets in the folder or workspace.
+
+        Returns:
+            int: The ID of the sheet, or None if there is no sheet with that name.
+        """
+        with self.lock:
+            refreshed = False
+            if time.time() - self.fetched_at > self.ttl:
+                self.refresh(list_sheets)
+                refreshed = True
+
+            sheet_id = self.find(name)
+            if sheet_id is None and not refreshed:
+                self.refresh(list_sheets)
+                sheet_id = self.find(name)
+
+            return sheet_id
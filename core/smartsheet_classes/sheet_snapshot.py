@@ -0,0 +1,269 @@
+import pandas as pd
+from ..smartsheet_functions.compare_frames import fingerprint_rows
+
+
+class SheetSnapshot:
+    """A copy of a sheet that is downloaded once and shared by the SmartSheetApi methods.
+
+    The snapshot remembers the sheet's version number. Once it has been marked as stale (for example after
+    rows were written to the sheet), it is only downloaded again if the version in Smartsheet has changed.
+
+    If a SnapshotCache is provided, the snapshot is synced incrementally: the cached snapshot is reused as is when
+    the version has not changed, and otherwise only the rows modified since then are downloaded and merged into it.
+    The fingerprints of the rows are cached with the snapshot, and only the modified rows are fingerprinted again.
+
+    Args:
+        smartsheet_client (SmartsheetClient): The Smartsheet client used to fetch the sheet.
+        scheduler (RequestScheduler): The scheduler the API calls are sent through.
+        sheet_id (int): The ID of the sheet.
+        column_ids (list, optional): The IDs of the columns to download. Defaults to every column in the sheet.
+        store (SnapshotCache, optional): The cache used to sync the snapshot incrementally.
+    """
+
+    def __init__(self, smartsheet_client, scheduler, sheet_id, column_ids=None, store=None):
+        self.smartsheet_client = smartsheet_client
+        self.scheduler = scheduler
+        self.sheet_id = sheet_id
+        self.column_ids = list(column_ids) if column_ids else None
+        self.columns = {}
+        self.fingerprint_columns = None
+        self.fingerprints = {}
+        self.row_data = {}
+        self.sheet = None
+        self.stale = False
+        self.store = store
+        self.synced_at = None
+        self.version = None
+
+
+    @property
+    def rows(self):
+        """list: The Row objects in the downloaded sheet."""
+        return self.get_sheet().rows
+
+
+    def get_sheet(self):
+        """Gets the downloaded Sheet object, downloading the whole sheet if the snapshot was synced incrementally.
+
+        Returns:
+            Sheet: The sheet.
+        """
+        if self.sheet is None:
+            self.load()
+
+        return self.sheet
+
+
+    def fetch(self, rows_modified_since=None):
+        """Downloads the sheet from Smartsheet.
+
+        Args:
+            rows_modified_since (str, optional): Only download the rows modified after this time, in ISO 8601 format.
+
+        Returns:
+            Sheet: The downloaded sheet.
+        """
+        options = {}
+        if self.column_ids:
+            options["column_ids"] = ",".join(str(column_id) for column_id in self.column_ids)
+        if rows_modified_since:
+            options["rows_modified_since"] = rows_modified_since
+
+        return self.scheduler.call(self.smartsheet_client.Sheets.get_sheet, self.sheet_id, **options)
+
+
+    def load(self, sheet=None):
+        """Downloads the whole sheet from Smartsheet.
+
+        Args:
+            sheet (Sheet, optional): A sheet that has already been downloaded. If provided, it is used instead of downloading the sheet.
+
+        Returns:
+            SheetSnapshot: The loaded snapshot.
+        """
+        self.sheet = sheet if sheet is not None else self.fetch()
+        self.columns = {column.title: column.id for column in self.sheet.columns}
+        self.row_data = self.read_rows(self.sheet.rows)
+        self.fingerprints = {}
+        self.version = self.sheet.version
+        self.synced_at = self.modified_at(self.sheet)
+        self.stale = False
+        self.save()
+        return self
+
+
+    def sync(self, version=None):
+        """Brings the snapshot up to date, only downloading the rows modified since the last sync when possible.
+
+        Args:
+            version (int, optional): The current version of the sheet, if it is already known. Defaults to asking Smartsheet.
+
+        Returns:
+            SheetSnapshot: The up to date snapshot.
+        """
+        state = self.store.load(self.sheet_id, self.column_ids) if self.store is not None else None
+        if state is None or not self.within(state["column_ids"]):
+            return self.load()
+
+        self.column_ids = state["column_ids"]
+        self.columns = state["columns"]
+        self.row_data = state["rows"]
+        self.fingerprint_columns = state.get("fingerprint_columns")
+        self.fingerprints = state.get("fingerprints") or {}
+        self.synced_at = state["synced_at"]
+        self.version = state["version"]
+        self.stale = False
+
+        if (version if version is not None else self.current_version()) == self.version:
+            return self
+
+        # - Merge the modified rows into the saved rows
+        sheet = self.fetch(rows_modified_since=self.synced_at)
+        modified_rows = self.read_rows(sheet.rows)
+        self.row_data.update(modified_rows)
+        for row_id in modified_rows:
+            self.fingerprints.pop(row_id, None)
+
+        # - Deleted rows are not reported, but they leave the saved state with more rows than the sheet
+        if len(self.row_data) != sheet.total_row_count:
+            return self.load()
+
+        self.sheet = None
+        self.columns = {column.title: column.id for column in sheet.columns}
+        self.version = sheet.version
+        self.synced_at = self.modified_at(sheet) or self.synced_at
+        self.save()
+        return self
+
+
+    def save(self):
+        """Saves the snapshot to the cache, if the snapshot is synced incrementally."""
+        if self.store is None:
+            return
+
+        self.store.save(self.sheet_id, {
+            "version": self.version,
+            "synced_at": self.synced_at,
+            "column_ids": self.column_ids,
+            "columns": self.columns,
+            "rows": self.row_data,
+            "fingerprint_columns": self.fingerprint_columns,
+            "fingerprints": self.fingerprints,
+        })
+
+
+    def row_fingerprints(self, column_ids):
+        """Gets the fingerprint of every row over a set of columns, only fingerprinting the rows that are not cached.
+
+        Args:
+            column_ids (list): The IDs of the columns the fingerprints cover.
+
+        Returns:
+            dict: The fingerprint of each row, keyed by row ID.
+        """
+        column_ids = sorted(column_ids)
+        if column_ids != self.fingerprint_columns:
+            self.fingerprint_columns = column_ids
+            self.fingerprints = {}
+
+        missing = {row_id: values for row_id, values in self.row_data.items() if row_id not in self.fingerprints}
+        if missing:
+            frame = pd.DataFrame.from_dict(missing, orient="index").reindex(index=list(missing), columns=column_ids)
+            self.fingerprints.update(zip(frame.index.tolist(), fingerprint_rows(frame).tolist()))
+
+            # - Only the fingerprints are written, the rows in the cache have not changed
+            if self.store is not None:
+                self.store.save_fingerprints(self.sheet_id, self.column_ids, self.fingerprint_columns, self.fingerprints)
+
+        return self.fingerprints
+
+
+    def current_version(self):
+        """Gets the current version of the sheet from Smartsheet.
+
+        Returns:
+            int: The version of the sheet.
+        """
+        return self.scheduler.call(self.smartsheet_client.Sheets.get_sheet_version, self.sheet_id).version
+
+
+    def refresh(self):
+        """Downloads the sheet again if its version has changed since it was loaded.
+
+        Returns:
+            SheetSnapshot: The up to date snapshot.
+        """
+        if self.store is not None:
+            return self.sync()
+
+        if self.version is None or self.current_version() != self.version:
+            return self.load()
+
+        self.stale = False
+        return self
+
+
+    def invalidate(self):
+        """Marks the snapshot as stale so the next use checks the sheet's version."""
+        self.stale = True
+
+
+    def covers(self, column_ids=None):
+        """Checks if the snapshot contains the requested columns.
+
+        Args:
+            column_ids (list, optional): The IDs of the columns that are needed. None means every column.
+
+        Returns:
+            bool: True if the snapshot contains all of the requested columns, False otherwise.
+        """
+        if self.column_ids is None:
+            return True
+        if column_ids is None:
+            return False
+        return set(column_ids) <= set(self.column_ids)
+
+
+    def within(self, column_ids):
+        """Checks if the columns of the snapshot are all contained in another set of columns.
+
+        Args:
+            column_ids (list): The IDs of the other columns. None means every column.
+
+        Returns:
+            bool: True if every column of the snapshot is in column_ids, False otherwise.
+        """
+        if column_ids is None:
+            return True
+        if self.column_ids is None:
+            return False
+        return set(self.column_ids) <= set(column_ids)
+
+
+    @staticmethod
+    def read_rows(rows):
+        """Reads the cell values out of Row objects.
+
+        Args:
+            rows (list): The Row objects to read.
+
+        Returns:
+            dict: The cell values of each row, keyed by row ID and then by column ID.
+        """
+        return {row.id: {cell.column_id: cell.value for cell in row.cells} for row in rows}
+
+
+    @staticmethod
+    def modified_at(sheet):
+        """Gets the time a sheet was last modified, using Smartsheet's clock.
+
+        Args:
+            sheet (Sheet): The downloaded sheet.
+
+        Returns:
+            str: The modified time in ISO 8601 format, or None if the sheet does not have one.
+        """
+        modified_at = getattr(sheet, "modified_at", None)
+        if modified_at is None:
+            return None
+        return modified_at.isoformat() if hasattr(modified_at, "isoformat") else str(modified_at)
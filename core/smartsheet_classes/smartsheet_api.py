@@ -1,25 +1,50 @@
+import asyncio
+import math
 import smartsheet
 import pandas as pd
+from ..metrics import metrics
 from ..smartsheet_functions.client import create_smartsheet_client
+from ..smartsheet_functions.compare_frames import compare_frames, plan_sync, unique_keys
+from ..smartsheet_functions.update_data_in_smartsheet import IMPORT_COLUMN_MAP
+from .async_smartsheet_api import AsyncSmartSheetApi
+from .bulk_writer import BulkWriter
+from .duplicate_index import DuplicateIndex
+from .progress import Progress
+from .request_scheduler import RequestScheduler
+from .sheet_name_index import SheetNameIndex
+from .sheet_snapshot import SheetSnapshot
+from .snapshot_cache import SnapshotCache
 
 
 class SmartSheetApi:
-    def __init__(self, api_key, folder_id = None, new_sheet_name = None, sheet_data = None, sheet_id = None, sheet_name = None, workspace_id = None):
+
+    # - A cell format that only sets the background color (the tenth field) to color 25 of the Smartsheet palette
+    HIGHLIGHT_FORMAT = ",,,,,,,,,25,,,,,,,"
+
+    def __init__(self, api_key, folder_id = None, new_sheet_name = None, sheet_data = None, sheet_id = None, sheet_name = None, workspace_id = None, progress = None):
         """Initializes a SheetManager object.
 
         Args:
             sheet_id (int): The ID of the sheet to manage.
             sheet_data (pandas DataFrame, optional): The data for the sheet. If not provided, the data will be fetched from Smartsheet.
+            progress (Progress, optional): The progress that rows and batches are counted in, and that can cancel a write between batches.
         """
+        self.api_key = api_key
         self.folder_id = folder_id
+        self.data_column_ids = None
         self.key_column_id = None
         self.new_sheet_name = new_sheet_name
+        self.progress = progress or Progress()
         self.sheet_columns = None
         self.sheet_data = sheet_data
         self.sheet_id = sheet_id
         self.sheet_name = sheet_name
         self.smartsheet_client = create_smartsheet_client(api_key)
-        self.smartsheet_data = None
+        self.scheduler = RequestScheduler(api_key)
+        self.bulk_writer = BulkWriter(self.smartsheet_client, self.scheduler, progress=self.progress)
+        self.snapshot_cache = SnapshotCache()
+        self.snapshots = {}
+        self.sheet_versions = {}
         self.workspace_id = workspace_id
 
 
@@ -29,7 +54,7 @@ class SmartSheetApi:
         Returns:
             list: A list of dictionaries, where each dictionary contains the name and ID of a sheet.
         """
-        sheets = self.smartsheet_client.Folders.list_sheets(self.folder_id).result.data
+        sheets = self.scheduler.call(self.smartsheet_client.Folders.get_folder, self.folder_id).sheets
         return [{"name": sheet.name, "id": sheet.id} for sheet in sheets]
     
 
@@ -39,38 +64,41 @@ class SmartSheetApi:
         Returns:
             list: A list of dictionaries, where each dictionary contains the name and ID of a sheet.
         """
-        sheets = self.smartsheet_client.Workspaces.get_workspace(self.workspace_id).sheets
+        # - Only the top level of the workspace is loaded, not the contents of its folders
+        sheets = self.scheduler.call(self.smartsheet_client.Workspaces.get_workspace, self.workspace_id, load_all=False).sheets
         return [{"name": sheet.name, "id": sheet.id} for sheet in sheets]
 
 
     def get_sheet_id_by_name(self):
         """Returns the ID of a sheet by its name.
-        
+
+        The name is looked up in the sheet name index of the folder or workspace, which is shared by every
+        SmartSheetApi object and ignores case. The folder or workspace is only listed again when the index is
+        older than settings.SHEET_NAME_TTL or the name is not in it.
+
         Returns:
             int: The ID of the sheet.
         """
-        try:
-            if not hasattr(self, 'sheets'):
-                if self.folder_id:
-                    print("has folder id")
-                    self.sheets = self.get_sheets_in_folder()
-                elif self.workspace_id:
-                    print("has workspace id")
-                    self.sheets = self.get_sheets_in_workspace()
-                else: 
-                    print("The SmartSheetApi objects, folder_id and workspace_id, have no value. Please re-run after correcting issue.")
-                    return
-            
-            sheet = next((sheet for sheet in self.sheets if sheet["name"] == self.sheet_name), None)
-            if sheet:
-                self.sheet_id = sheet["id"]
-                return sheet["id"] 
-            else:
-                None
+        if self.folder_id:
+            parent_id, list_sheets = self.folder_id, self.get_sheets_in_folder
+        elif self.workspace_id:
+            parent_id, list_sheets = self.workspace_id, self.get_sheets_in_workspace
+        else:
+            print("The SmartSheetApi objects, folder_id and workspace_id, have no value. Please re-run after correcting issue.")
+            return
 
+        try:
+            with metrics.span("sheet_name_resolution"):
+                sheet_id = SheetNameIndex.shared(parent_id, self.snapshot_cache).lookup(self.sheet_name, list_sheets)
         except Exception as e:
             print(str(e))
+            return
 
+        if sheet_id and sheet_id != self.sheet_id:
+            self.sheet_id = sheet_id
+            self.sheet_columns = None
+
+        return sheet_id
 
 
     def create_sheet_in_workspace(self, template_sheet_id, new_sheet_name,):
@@ -84,13 +112,15 @@ class SmartSheetApi:
             Sheet: The new sheet that was created.
         """
         # - Create a new sheet from the template
-        new_sheet = self.smartsheet_client.Workspaces.create_sheet_in_workspace_from_template(
-            self.workspace_id,
-            smartsheet.models.Sheet({
-                'name': new_sheet_name,
-                'from_id': int(template_sheet_id)
-            })
-        ).result
+        with metrics.span("create_sheet"):
+            new_sheet = self.scheduler.call(
+                self.smartsheet_client.Workspaces.create_sheet_in_workspace_from_template,
+                self.workspace_id,
+                smartsheet.models.Sheet({
+                    'name': new_sheet_name,
+                    'from_id': int(template_sheet_id)
+                })
+            ).result
 
         # - Return the new sheet
         return new_sheet
@@ -106,7 +136,8 @@ class SmartSheetApi:
         Returns:
             Sheet: The new sheet that was created.
         """
-        new_sheet = self.smartsheet_client.Folders.create_sheet_from_template(
+        new_sheet = self.scheduler.call(
+            self.smartsheet_client.Folders.create_sheet_from_template,
             self.folder_id,
             smartsheet.models.Sheet({
                 'name': new_sheet_name,
@@ -117,23 +148,136 @@ class SmartSheetApi:
         return new_sheet
 
 
+    def get_snapshot(self, sheet_id=None, column_ids=None):
+        """Gets the shared snapshot of a sheet, downloading it only when needed.
+
+        A snapshot is reused as long as it contains the requested columns. If it has been invalidated by a write,
+        it is only downloaded again when the sheet's version has changed. New snapshots start from the local
+        snapshot cache, which is used as is when the sheet's version has not changed. Otherwise only the rows
+        modified since the cached version are downloaded.
+
+        Args:
+            sheet_id (int, optional): The ID of the sheet. Defaults to sheet_id.
+            column_ids (list, optional): The IDs of the columns that are needed. Defaults to every column.
+
+        Returns:
+            SheetSnapshot: The snapshot of the sheet.
+        """
+        sheet_id = sheet_id or self.sheet_id
+        snapshot = self.snapshots.get(sheet_id)
+
+        if snapshot is None or not snapshot.covers(column_ids):
+            # - The version read by get_columns is reused, so the sync does not ask for it again
+            snapshot = SheetSnapshot(
+                self.smartsheet_client, self.scheduler, sheet_id, column_ids, self.snapshot_cache
+            ).sync(self.sheet_versions.get(sheet_id))
+            self.snapshots[sheet_id] = snapshot
+        elif snapshot.stale:
+            snapshot.refresh()
+
+        return snapshot
+
+
+    def load_snapshots(self, sheet_ids, column_ids=None):
+        """Downloads several sheets at the same time and stores them as snapshots.
+
+        Args:
+            sheet_ids (list): The IDs of the sheets to download.
+            column_ids (list or dict, optional): The IDs of the columns to download from every sheet, or the IDs of
+                the columns of each sheet keyed by sheet ID. Defaults to every column.
+
+        Returns:
+            List[SheetSnapshot]: The snapshots of the sheets, in the same order as sheet_ids.
+        """
+        # - Sheets made from the same template have the same column titles but different column IDs
+        sheet_columns = column_ids if isinstance(column_ids, dict) else dict.fromkeys(sheet_ids, column_ids)
+        sheets = self.run_async(
+            lambda api: asyncio.gather(*(api.get_sheet(sheet_id, sheet_columns.get(sheet_id)) for sheet_id in sheet_ids))
+        )
+
+        snapshots = []
+        for sheet_id, sheet in zip(sheet_ids, sheets):
+            snapshot = SheetSnapshot(
+                self.smartsheet_client, self.scheduler, sheet_id, sheet_columns.get(sheet_id), self.snapshot_cache
+            )
+            self.snapshots[sheet_id] = snapshot.load(smartsheet.models.Sheet(sheet))
+            snapshots.append(snapshot)
+
+        return snapshots
+
+
+    def run_async(self, operation):
+        """Runs an operation on the asyncio engine and waits for its result.
+
+        Args:
+            operation (callable): A function that takes an AsyncSmartSheetApi object and returns a coroutine.
+
+        Returns:
+            Any: The result of the coroutine.
+        """
+        async def run():
+            async with AsyncSmartSheetApi(self.api_key, self.folder_id, self.workspace_id) as api:
+                return await operation(api)
+
+        return asyncio.run(run())
+
+
+    def invalidate_snapshot(self, sheet_id=None):
+        """Marks the snapshot of a sheet as stale after the sheet has been changed.
+
+        Args:
+            sheet_id (int, optional): The ID of the sheet. Defaults to sheet_id.
+        """
+        self.sheet_versions.pop(sheet_id or self.sheet_id, None)
+        snapshot = self.snapshots.get(sheet_id or self.sheet_id)
+        if snapshot is not None:
+            snapshot.invalidate()
+
+
+    def get_sheet_version(self, sheet_id=None):
+        """Gets the current version of a sheet, asking Smartsheet only once until the sheet is changed.
+
+        Args:
+            sheet_id (int, optional): The ID of the sheet. Defaults to sheet_id.
+
+        Returns:
+            int: The version of the sheet.
+        """
+        sheet_id = sheet_id or self.sheet_id
+        if sheet_id not in self.sheet_versions:
+            self.sheet_versions[sheet_id] = self.scheduler.call(
+                self.smartsheet_client.Sheets.get_sheet_version, sheet_id
+            ).version
+
+        return self.sheet_versions[sheet_id]
+
+
     def get_columns(self):
 
         """Gets the column names and IDs for the sheet.
 
+        Only the column definitions are downloaded, not the rows, so the data fetch that follows can ask for just
+        the columns it needs. The columns are saved in the snapshot cache with the sheet's version, and are read
+        from there as long as the version has not changed. The columns are kept until they are changed with
+        update_columns.
+
         Returns:
             dict: A dictionary of column names and IDs.
         """
-        # - Get the sheet
-        sheet = self.smartsheet_client.Sheets.get_sheet(self.sheet_id)
-
-        # - Get the list of columns in the sheet
-        all_sheet_columns = sheet.columns
+        if self.sheet_columns is None:
+            with metrics.span("column_fetch"):
+                version = self.get_sheet_version()
+                cached = self.snapshot_cache.load_columns(self.sheet_id)
 
-        # - Create a dictionary of column names and IDs
-        self.sheet_columns = {}
-        for column in all_sheet_columns:
-            self.sheet_columns[column.title] = column.id
+                if cached is not None and cached["version"] == version:
+                    self.sheet_columns = cached["columns"]
+                else:
+                    # - Create a dictionary of column names and IDs
+                    columns = self.scheduler.call(
+                        self.smartsheet_client.Sheets.get_columns, self.sheet_id, include_all=True
+                    ).data
+                    self.sheet_columns = {column.title: column.id for column in columns}
+                    self.snapshot_cache.save_columns(self.sheet_id, version, self.sheet_columns)
 
         return self.sheet_columns
 
@@ -151,7 +295,7 @@ class SmartSheetApi:
         Returns:
             Sheet: The updated sheet.
         """
-        sheet = self.smartsheet_client.Sheets.get(sheet_id).result
+        sheet = self.get_snapshot(sheet_id).get_sheet()
         existing_columns = {col.title: col for col in sheet.columns}
 
         for col in new_columns:
@@ -163,8 +307,10 @@ class SmartSheetApi:
             else:
                 sheet.columns.append(smartsheet.models.Column(col))
 
-        self.smartsheet_client.Sheets.update(sheet)
-        return self.smartsheet_client.Sheets.get(sheet_id).result
+        self.scheduler.call(self.smartsheet_client.Sheets.update, sheet)
+        self.invalidate_snapshot(sheet_id)
+        self.sheet_columns = None
+        return self.get_snapshot(sheet_id).get_sheet()
 
 
     def get_row(self, row_id):
@@ -177,43 +323,89 @@ class SmartSheetApi:
             Row: The row object with the specified ID.
         """
         # - Get the row
-        row = self.smartsheet_client.Sheets.get_row(self.sheet_id, row_id)
+        row = self.scheduler.call(self.smartsheet_client.Sheets.get_row, self.sheet_id, row_id)
 
         return row
 
 
-    def add_rows(self, mapped_columns, column_dict, compare_dict_keys, allowed):
+    def add_rows(self, mapped_columns, column_dict, excel_keys, allowed):
         """Adds rows to the sheet.
 
+        If duplicates are allowed, the duplicate keys are marked with " - duplicate" and every row with a
+        duplicate key is highlighted once the rows have been added.
+
         Args:
-            rows_data (list): A list of dictionaries containing the data for each row.
+            mapped_columns (iterable): The dictionaries of column names and values for each row.
             column_dict (dict): A dictionary of column names and IDs.
+            excel_keys (iterable): The key of every Excel row, including repeated keys.
             allowed (bool): True if duplicates are allowed, False otherwise.
 
         Returns:
-            list: A list of the added rows.
+            str: "Success" if every batch of rows was added.
+            list: ["Duplicates Found", duplicates] if duplicates are not allowed, or ["Write Failed", errors] if any batch failed.
         """
-        # - Create a list of row objects
-        rows = []
+        duplicates = self.check_duplicates(excel_keys)
 
-        duplicates = self.check_duplicates(compare_dict_keys)
+        if duplicates.added and not allowed:
+            return ["Duplicates Found", duplicates.report()]
+
+        # - Create the row objects as they are sent
+        rows = (
+            self.build_new_row(mapped_column, column_dict, duplicates if allowed else None)
+            for mapped_column in mapped_columns
+        )
+
+        added = self.write_new_rows(rows)
+        if added != "Success" or not duplicates.keys:
+            return added
+
+        errors = BulkWriter.errors(self.highlight_duplicates(duplicates.row_ids(self.get_sheet_keys())))
+        if errors:
+            return ["Write Failed", errors]
+
+        return added
+
+
+    def build_new_row(self, mapped_column, column_dict=None, duplicates=None):
+        """Builds a Row object to add to the bottom of the sheet.
+
+        Args:
+            mapped_column (dict): A dictionary of column names and values for the row.
+            column_dict (dict, optional): A dictionary of column names and IDs. If not provided, the keys of mapped_column are column IDs.
+            duplicates (DuplicateIndex, optional): The duplicate keys. Matching values are marked with " - duplicate".
+
+        Returns:
+            Row: The row object.
+        """
+        new_row = smartsheet.models.Row()
+        new_row.to_bottom = True
+        for column_name, value in mapped_column.items():
+            cell = smartsheet.models.Cell()
+            cell.column_id = column_dict[column_name] if column_dict is not None else column_name
+            cell.value = duplicates.mark(value) if duplicates is not None else value
+            new_row.cells.append(cell)
+
+        return new_row
+
+
+    def write_new_rows(self, rows):
+        """Adds rows to the bottom of the sheet in batches.
+
+        Args:
+            rows (iterable): The Row objects to add. If rows is a generator, batches are sent while it is still producing rows.
+
+        Returns:
+            str: "Success" if every batch of rows was added.
+            list: ["Write Failed", errors] if any batch failed.
+        """
+        # - Rows are added to the bottom of the sheet, so the batches are sent in order
+        results = self.bulk_writer.write(self.sheet_id, "add", rows, ordered=True)
+        self.invalidate_snapshot()
+
+        errors = BulkWriter.errors(results)
+        if errors:
+            return ["Write Failed", errors]
 
-        if duplicates and not allowed:
-            return ["Duplicates Found", duplicates]
-        
-        for mapped_column in mapped_columns:
-            new_row = smartsheet.models.Row()
-            new_row.to_bottom = True
-            for column_name, value in mapped_column.items():
-                column_id = column_dict[column_name]
-                cell = smartsheet.models.Cell()
-                cell.column_id = column_id
-                cell.value = f"{value} - duplicate" if value in duplicates and allowed else value
-                new_row.cells.append(cell)
-            rows.append(new_row)
-
-        self.smartsheet_client.Sheets.add_rows(self.sheet_id, rows)
-        
         return "Success"
 
 
@@ -227,207 +419,379 @@ class SmartSheetApi:
             column_dict (dict): A dictionary of column names and IDs.
     
         Returns:
-            list: A list of Row objects for the updated rows.
+            List[BatchResult]: The result of each batch of updated rows.
         """
-        # - Create a list of row objects
+        # - Create a list of partial row objects that only contain the changed cells
         rows = []
         for row_data in rows_data:
-            row_id = row_data["row_id"]
-            row = self.smartsheet_client.Sheets.get_row(self.sheet_id, row_id)
-            for column_name, value in row_data.items():
-                if column_name == "row_id":
-                    continue
-                column_id = column_dict[column_name]
-                cell = [c for c in row.cells if c.column_id == column_id][0]
-                cell.value = value
-            rows.append(row)
+            cell_values = {
+                column_dict[column_name]: value
+                for column_name, value in row_data.items()
+                if column_name != "row_id"
+            }
+            rows.append(self.build_partial_row(row_data["row_id"], cell_values))
 
         # - Update the rows
-        updated_rows = self.smartsheet_client.Sheets.update_rows(self.sheet_id, rows)
+        results = self.bulk_writer.write(self.sheet_id, "update", rows)
+        self.invalidate_snapshot()
+
+        return results
+
+
+    def build_partial_row(self, row_id, cell_values):
+        """Builds a Row object that only contains the cells being changed.
+
+        Args:
+            row_id (int): The ID of the row to update.
+            cell_values (dict): A dictionary of column IDs and the new values for those cells.
+
+        Returns:
+            Row: A row object containing the row ID and the changed cells.
+        """
+        row = smartsheet.models.Row()
+        row.id = row_id
+        for column_id, value in cell_values.items():
+            cell = smartsheet.models.Cell()
+            cell.column_id = column_id
+            cell.value = value
+            row.cells.append(cell)
 
-        return updated_rows
+        return row
 
 
-    def delete_rows(self, row_id):
-        """Deletes a row from the sheet by its ID.
+    def delete_rows(self, row_ids):
+        """Deletes rows from the sheet by their IDs.
 
         Args:
-            row_id (int): The ID of the row to delete.
+            row_ids (int or list): The ID of the row to delete, or a list of row IDs.
+
+        Returns:
+            List[BatchResult]: The result of each batch of deleted rows.
         """
-        # - Delete the row
-        self.smartsheet_client.Sheets.delete_rows(self.sheet_id, row_id)
+        if isinstance(row_ids, int):
+            row_ids = [row_ids]
+
+        # - Delete the rows
+        results = self.bulk_writer.write(self.sheet_id, "delete", row_ids)
+        self.invalidate_snapshot()
+
+        return results
 
 
-    def highlight_duplicates(self, duplicate_ids):
+    def highlight_duplicates(self, duplicate_ids, column_ids=None):
         """Highlights all rows with duplicate IDs.
 
+        The rows are built from the snapshot of the sheet instead of being downloaded one at a time, and they are
+        sent in batches. Each cell keeps its current value and only its background color is changed.
+
         Args:
-        duplicate_ids (list): A list of IDs for rows with duplicates.
+            duplicate_ids (list): A list of IDs for rows with duplicates.
+            column_ids (list, optional): The IDs of the columns to highlight. Defaults to data_column_ids, or the
+                key column and the columns the Excel columns are mapped to if data_column_ids is not set.
+
+        Returns:
+            List[BatchResult]: The result of each batch of highlighted rows.
         """
-        format_string = ",,,,,,,,,25,,,,,,,"
-        for duplicate_id in duplicate_ids:
-            row = self.smartsheet_client.Sheets.get_row(self.sheet_id, duplicate_id)
+        column_ids = column_ids or self.data_column_ids or self.mapped_column_ids()
+        row_data = self.get_snapshot(column_ids=column_ids).row_data
+
+        rows = []
+        for row_id in duplicate_ids:
+            values = row_data.get(row_id)
+            if values is None:
+                continue
+
+            # - Empty cells are sent as "" because every cell in an update needs a value
+            cell_values = {column_id: "" if values.get(column_id) is None else values[column_id] for column_id in column_ids}
+            row = self.build_partial_row(row_id, cell_values)
             for cell in row.cells:
-                cell.format_ = smartsheet.models.Format()
-                cell.format_.background_color = format_string
+                cell.format_ = self.HIGHLIGHT_FORMAT
+            rows.append(row)
 
-        self.smartsheet_client.Sheets.update_rows(self.sheet_id, [row])
+        results = self.bulk_writer.write(self.sheet_id, "update", rows)
+        self.invalidate_snapshot()
 
+        return results
 
 
-    def get_data(self):
+    def mapped_column_ids(self):
+        """Gets the IDs of the key column and of the columns the Excel columns are imported into.
+
+        Returns:
+            list: The column IDs, starting with the key column. Columns that are not in the sheet are left out.
+        """
+        columns = self.get_columns()
+        column_ids = [columns[title] for title in IMPORT_COLUMN_MAP.values() if title in columns]
+
+        if self.key_column_id is not None and self.key_column_id not in column_ids:
+            column_ids.insert(0, self.key_column_id)
+
+        return column_ids
+
+
+    def get_data(self, column_ids=None):
         """
         Retrieves the data from the sheet based on the specified column IDs.
 
         Args:
-            column_ids (List[str]): A list of column IDs to retrieve data from.
+            column_ids (List[int], optional): A list of column IDs to retrieve data from. Defaults to data_column_ids,
+                or every column in sheet_columns if data_column_ids is not set.
 
         Returns:
-            dict: A dictionary representing the sheet data, where the keys are the row IDs and the values are dictionaries representing the column values for each row.
+            dict: A dictionary representing the sheet data, where the keys are the key column values and the values are dictionaries representing the column values for each row.
+                  Each row dictionary also contains a "row" key with the ID of the row.
+        """
+        columns = self.get_column_data(column_ids)
+
+        # - Pivot the columnar data back into one dictionary per row
+        data = {item_id: {"row": row_id} for item_id, row_id in columns["row"].items()}
+        for column_id, values in columns.items():
+            if column_id == "row":
+                continue
+            for item_id, value in values.items():
+                data[item_id][column_id] = value
+
+        return data
+
 
-        Raises:
-            ValueError: If the provided column IDs are not a list.
-            ValueError: If any of the provided column IDs are not strings.
-            Exception: If there is an error retrieving data from Smartsheet.
+    def get_column_data(self, column_ids=None):
         """
-        # - Fetch the sheet data
-        columns_ids = self.sheet_columns.values()
-        rows = self.smartsheet_client.Sheets.get_sheet(self.sheet_id).rows
-        # - Build the data frame
-        data = {}
-        for row in rows:
-            row_data = {}
-            has_data = False
-            
-            for cell in row.cells:
-                column = next(c for c in columns_ids if c == cell.column_id)
-                row_data['row'] = row.id
-                row_data[column] = cell.value
-                has_data = True
-            if has_data:
-                item_id = row_data.get(self.key_column_id)
-                
-                if item_id is not None:
-                    data[item_id] = row_data
-                else:
-                    row_data.clear()
+        Retrieves the data from the sheet one column at a time, keyed by the values in the key column.
+
+        Only the requested columns are downloaded from Smartsheet. Rows without a value in the key column are skipped.
+
+        Args:
+            column_ids (List[int], optional): A list of column IDs to retrieve data from. Defaults to data_column_ids,
+                or every column in sheet_columns if data_column_ids is not set.
+
+        Returns:
+            dict: A dictionary where the keys are column IDs and the values are dictionaries mapping each key column value to the cell value.
+                  The "row" key maps each key column value to the ID of its row.
+        """
+        if column_ids is None:
+            column_ids = self.data_column_ids or list(self.sheet_columns.values())
+
+        # - Build a hash index of the requested columns, always including the key column
+        column_index = dict.fromkeys(column_ids)
+        if self.key_column_id is not None:
+            column_index.setdefault(self.key_column_id)
+
+        # - Only ask Smartsheet for the columns we need, unless the shared snapshot already has them
+        with metrics.span("data_fetch"):
+            row_data = self.get_snapshot(column_ids=list(column_index)).row_data
+
+        data = {column_id: {} for column_id in column_index}
+        data["row"] = {}
+        for row_id, values in row_data.items():
+            item_id = values.get(self.key_column_id)
+
+            if item_id is None:
+                continue
+
+            data["row"][item_id] = row_id
+            for column_id in column_index:
+                if column_id in values:
+                    data[column_id][item_id] = values[column_id]
+
         return data
 
-    def check_duplicates(self, compare_dict_keys):
+
+    def get_frame(self, column_ids=None):
         """
-        Checks if there are any duplicate values in the specified column.
+        Retrieves the data from the sheet as a DataFrame indexed by the values in the key column.
 
         Args:
-            compare_dict_keys (str): The ID of the column to check for duplicates.
+            column_ids (List[int], optional): A list of column IDs to retrieve data from. Defaults to data_column_ids,
+                or every column in sheet_columns if data_column_ids is not set.
 
         Returns:
-            bool: True if there are duplicates in the column, False otherwise.
+            pd.DataFrame: The sheet data, with one column for each column ID and a "row" column with the ID of each row.
+        """
+        return pd.DataFrame(self.get_column_data(column_ids))
+
+
+    def is_sheet_empty(self):
+        """Checks if the sheet has any rows.
 
-        Raises:
-            ValueError: If the provided column ID is not a string.
-            KeyError: If the provided column ID is not found in the sheet data.
+        Returns:
+            bool: True if the sheet has no rows, False otherwise.
         """
-        if self.smartsheet_data is None:
-            self.smartsheet_data = self.get_data()
+        snapshot = self.snapshots.get(self.sheet_id)
+        if snapshot is not None and not snapshot.stale:
+            return len(snapshot.row_data) == 0
 
-        num_rows = len(self.smartsheet_client.Sheets.get_sheet(self.sheet_id).rows)
-        # - If the sheet is empty, return None
-        if num_rows == 0:
-            return None
+        return self.get_row_count() == 0
 
 
-        duplicates = []
+    def get_row_count(self):
+        """Gets the number of rows in the sheet from Smartsheet, without downloading the sheet.
 
-        for key in compare_dict_keys.keys() & self.smartsheet_data.keys():
-            duplicates.append(key)
+        Returns:
+            int: The number of rows.
+        """
+        # - A single row page is enough to read the row count
+        sheet = self.scheduler.call(self.smartsheet_client.Sheets.get_sheet, self.sheet_id, page_size=1)
+        return sheet.total_row_count
 
-        if not duplicates:
-            return None
-        else:
-            return duplicates
+
+    def get_sheet_keys(self):
+        """
+        Gets the value in the key column of every row in the sheet.
+
+        Returns:
+            dict: The key of each row, keyed by row ID.
+        """
+        row_data = self.get_snapshot(column_ids=[self.key_column_id]).row_data
+        return {row_id: values.get(self.key_column_id) for row_id, values in row_data.items()}
+
+
+    def check_duplicates(self, excel_keys):
+        """
+        Finds the duplicate keys within the Excel data, within the sheet, and across the two.
+
+        Args:
+            excel_keys (iterable): The key of every Excel row, including repeated keys.
+
+        Returns:
+            DuplicateIndex: The duplicate keys.
+        """
+        return DuplicateIndex(excel_keys, self.get_sheet_keys())
 
 
     def compare_data(self, excel_data):
         """
-        Compares the Excel data with the Smartsheet data based on the specified key column ID.
+        Compares the Excel data with the Smartsheet data based on the key column.
+
+        The two sources are joined on the key column and every shared column is compared at once. Empty values
+        (NaN, None and "") are treated as equal, and so are numbers with the same value, such as 5 and 5.0.
+        Only the rows whose fingerprints differ between the two sources are compared cell by cell.
 
         Args:
-            excel_data (dict): A dictionary representing the Excel data to compare.
-            smartsheet_data (dict): A dictionary representing the Smartsheet data to compare.
-            key_column_id (str): The ID of the key column to compare.
+            excel_data (dict or pd.DataFrame): The Excel data to compare, keyed by the key column value, with the values of each row keyed by column ID.
 
         Returns:
-            Tuple[List[dict], List[dict], List[dict]]: A tuple of three lists representing the rows to add, update, and delete from the Smartsheet data.
+            pd.DataFrame: The changes table, with one row for each changed cell and the columns key, row_id,
+                column_id, old_value and new_value.
+        """
+        excel_data, sheet_frame, fingerprints = self.get_compare_frames(excel_data)
+        with metrics.span("diff"):
+            return compare_frames(excel_data, sheet_frame, fingerprints)
+
+
+    def get_compare_frames(self, excel_data):
+        """
+        Gets the frames and cached row fingerprints that the Excel data is compared with.
+
+        Args:
+            excel_data (dict or pd.DataFrame): The Excel data to compare, keyed by the key column value, with the values of each row keyed by column ID.
+
+        Returns:
+            Tuple[pd.DataFrame, pd.DataFrame, dict]: The Excel data, the Smartsheet data and the fingerprints of the Smartsheet rows.
+        """
+        if isinstance(excel_data, dict):
+            excel_data = pd.DataFrame.from_dict(excel_data, orient="index")
+
+        sheet_frame = self.get_frame()
 
-        Raises:
-            ValueError: If the provided Excel data is not a dictionary.
-            ValueError: If the provided Smartsheet data is not a dictionary.
-            ValueError: If the provided key column ID is not a string.
-            KeyError: If the provided key column ID is not found in either the Excel or Smartsheet data.
+        # - The fingerprints of the sheet rows are cached with the snapshot, so only changed rows are fingerprinted
+        columns = [column for column in excel_data.columns if column in sheet_frame.columns and column != "row"]
+        fingerprints = self.get_snapshot(column_ids=columns).row_fingerprints(columns)
+
+        return excel_data, sheet_frame, fingerprints
+
+
+    def plan_sync(self, excel_data):
         """
-        if self.smartsheet_data is None:
-            self.smartsheet_data = self.get_data()
+        Works out the rows to add, update and delete so the sheet matches the Excel data.
 
-        differences = {}
+        The rows whose keys were marked by an import with duplicates are kept on purpose, so they are never deleted.
 
-        for key in excel_data.keys() & self.smartsheet_data.keys():
-            subdict1 = self.smartsheet_data[key]
-            subdict2 = excel_data[key]
-            subdict_diff = {}
-            
-            # Compare sub-dictionaries
-            for subkey in subdict1.keys() & subdict2.keys():
-                if subdict1[subkey] != subdict2[subkey]:
-                    subdict_diff[subkey] = (subdict1[subkey], subdict2[subkey])
+        Args:
+            excel_data (dict or pd.DataFrame): The Excel data, keyed by the key column value, with the values of each row keyed by column ID.
+
+        Returns:
+            SyncPlan: The Excel rows to add, the changes table of the rows to update, the IDs of the rows to delete,
+                and the number of rows that are unchanged.
+        """
+        excel_data, sheet_frame, fingerprints = self.get_compare_frames(excel_data)
+        with metrics.span("diff"):
+            plan = plan_sync(excel_data, sheet_frame, fingerprints)
 
-            if subdict_diff:
-                differences[key] = subdict_diff
-        return differences
+        marked = sheet_frame.index.map(lambda key: isinstance(key, str) and key.endswith(DuplicateIndex.MARK))
+        kept = set(sheet_frame.loc[marked.to_numpy(dtype=bool), "row"])
+        return plan._replace(deletes=[row_id for row_id in plan.deletes if row_id not in kept])
 
 
-    def update_data(self, excel_data):
+    def sync_report(self, plan):
         """
-        Updates the sheet data with the data to compare.
+        Summarizes a sync plan and the number of API calls needed to run it.
 
         Args:
-            excel_data (dict): A dictionary representing the Excel data to be compared with the Smartsheet data.
-            key_column_id (str): The name of the column in both the Excel and Smartsheet data that contains the unique identifier for each item.
-            smartsheet_data (dict, optional): A dictionary representing the Smartsheet data to be compared with the Excel data. If not provided, the Smartsheet data will be fetched using the Smartsheet API.
-
-        Raises:
-            ValueError: If the provided Excel data is not a dictionary.
-            ValueError: If the provided key column ID is not a string.
-            ValueError: If the provided Smartsheet data is not a dictionary.
-            KeyError: If the provided key column ID is not found in either the Excel or Smartsheet data.
-            Exception: If there is an error updating the Smartsheet data with the Excel data.
-        """
-        if self.smartsheet_data is None:
-            self.smartsheet_data = self.get_data()
-
-        differences = self.compare_data(excel_data)
-        if not differences:
+            plan (SyncPlan): The plan returned by plan_sync.
+
+        Returns:
+            dict: The number of rows to add, update and delete, the number of unchanged rows, and the number of API calls.
+        """
+        batch_size = self.bulk_writer.batch_size
+        delete_batch_size = min(batch_size, BulkWriter.MAX_DELETE_BATCH_SIZE)
+        updated_rows = plan.changes["row_id"].nunique()
+
+        return {
+            "Rows to add": len(plan.adds),
+            "Rows to update": updated_rows,
+            "Rows to delete": len(plan.deletes),
+            "Unchanged rows": plan.unchanged,
+            "API calls": (
+                math.ceil(len(plan.adds) / batch_size)
+                + math.ceil(updated_rows / batch_size)
+                + math.ceil(len(plan.deletes) / delete_batch_size)
+            ),
+        }
+
+
+    def update_data(self, excel_data, dry_run=False, new_rows=None):
+        """
+        Makes the sheet match the Excel data.
+
+        Every key is sorted into add, update, delete or unchanged in one pass. Only the cells that changed are sent,
+        with one partial row for each changed row, new keys are added to the bottom of the sheet, and the rows whose
+        keys are no longer in the Excel data are deleted. Each operation is sent in batches.
+
+        Args:
+            excel_data (dict or pd.DataFrame): The Excel data, keyed by the key column value, with the values of each row keyed by column ID.
+            dry_run (bool, optional): True to only report the plan without changing the sheet.
+            new_rows (pd.DataFrame, optional): The values of the rows to add, keyed like excel_data but with every
+                column that a new row should fill. Defaults to the compared values of excel_data.
+
+        Returns:
+            list: ['No Differences'] if nothing changed, ["Dry Run", report] with a line for each part of the plan,
+                ['Update successful.'] if every batch was written, or ["Write Failed", errors] if any batch failed.
+        """
+        plan = self.plan_sync(excel_data)
+        if plan.adds.empty and plan.changes.empty and not plan.deletes:
             return ['No Differences']
 
-        rows_to_update = []
-        for row_id, row_changes in differences.items():
-            row = self.smartsheet_data[row_id].get("row")
-            cells_to_update = []
-            for col_id, (old_value, new_value) in row_changes.items():
-                new_cell = self.smartsheet_client.models.Cell()
-                new_cell.column_id = col_id
-                new_cell.value = new_value
-                cells_to_update.append(new_cell)
-            
-            new_row = self.smartsheet_client.models.Row()
-            new_row.id = row
-            new_row.cells = cells_to_update
-            rows_to_update.append(new_row)
-
-        self.smartsheet_client.Sheets.update_rows(
-            self.sheet_id, 
-            rows_to_update        
-        )
+        if dry_run:
+            return ["Dry Run", [f"{name}: {value}" for name, value in self.sync_report(plan).items()]]
 
-        return ['Update successful.']
+        self.progress.check()
+
+        # - Group the changed cells by row
+        cell_values = {}
+        for row_id, column_id, value in zip(plan.changes["row_id"].tolist(), plan.changes["column_id"].tolist(), plan.changes["new_value"].tolist()):
+            cell_values.setdefault(row_id, {})[column_id] = value
+
+        rows_to_update = [self.build_partial_row(row_id, values) for row_id, values in cell_values.items()]
+        adds = plan.adds if new_rows is None else unique_keys(new_rows).loc[plan.adds.index]
+        rows_to_add = (self.build_new_row(values) for values in adds.to_dict("records"))
 
+        results = self.bulk_writer.write(self.sheet_id, "update", rows_to_update)
+        results += self.bulk_writer.write(self.sheet_id, "add", rows_to_add, ordered=True)
+        results += self.bulk_writer.write(self.sheet_id, "delete", plan.deletes)
+        self.invalidate_snapshot()
 
+        errors = BulkWriter.errors(results)
+        if errors:
+            return ["Write Failed", errors]
+
+        return ['Update successful.']
@@ -0,0 +1,318 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from ..config import settings
+
+
+class SnapshotCache:
+    """A local SQLite cache of sheet snapshots and sheet name lookups that is shared by every GUI action.
+
+    Each sheet has one cached snapshot for each set of columns it was downloaded with, so snapshots of different
+    columns do not replace each other. Each snapshot is saved with the version of the sheet it was taken from,
+    containing:
+        - version (int): The version of the sheet.
+        - synced_at (str): The sheet's modified time when it was cached, in ISO 8601 format.
+        - column_ids (list): The IDs of the columns that were downloaded, or None for every column.
+        - columns (dict): The names and IDs of the sheet's columns.
+        - rows (dict): The cell values of each row, keyed by row ID and then by column ID.
+        - fingerprint_columns (list): The IDs of the columns the row fingerprints cover, or None if there are none.
+        - fingerprints (dict): The fingerprint of each row, keyed by row ID.
+
+    The names and IDs of every column of a sheet are cached separately with the version they were read at.
+
+    When the snapshots take up more than max_bytes, the least recently used snapshots are removed.
+
+    Args:
+        path (str, optional): The path of the SQLite database. Defaults to snapshots.sqlite3 in settings.CACHE_DIR.
+        max_bytes (int, optional): The largest total size of the cached snapshots. Defaults to settings.CACHE_MAX_MB.
+    """
+
+    lock = threading.Lock()
+
+    # - Raised when the layout of the tables changes, so caches written by older versions are rebuilt
+    SCHEMA_VERSION = 2
+
+    def __init__(self, path=None, max_bytes=None):
+        self.path = path or os.path.join(settings.CACHE_DIR, "snapshots.sqlite3")
+        self.max_bytes = max_bytes or settings.CACHE_MAX_MB * 1024 * 1024
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self.connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            if connection.execute("PRAGMA user_version").fetchone()[0] != self.SCHEMA_VERSION:
+                connection.execute("DROP TABLE IF EXISTS snapshots")
+                connection.execute("DROP TABLE IF EXISTS fingerprints")
+                connection.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+            connection.execute(
+                """CREATE TABLE IF NOT EXISTS snapshots (
+                    sheet_id INTEGER,
+                    column_key TEXT,
+                    version INTEGER,
+                    synced_at TEXT,
+                    column_ids TEXT,
+                    columns TEXT,
+                    rows TEXT,
+                    size INTEGER,
+                    accessed_at REAL,
+                    PRIMARY KEY (sheet_id, column_key)
+                )"""
+            )
+            connection.execute(
+                """CREATE TABLE IF NOT EXISTS fingerprints (
+                    sheet_id INTEGER,
+                    column_key TEXT,
+                    column_ids TEXT,
+                    hashes TEXT,
+                    PRIMARY KEY (sheet_id, column_key)
+                )"""
+            )
+            connection.execute(
+                """CREATE TABLE IF NOT EXISTS sheet_columns (
+                    sheet_id INTEGER PRIMARY KEY,
+                    version INTEGER,
+                    columns TEXT
+                )"""
+            )
+            connection.execute(
+                """CREATE TABLE IF NOT EXISTS sheet_names (
+                    parent_id INTEGER,
+                    name TEXT,
+                    sheet_id INTEGER,
+                    fetched_at REAL,
+                    PRIMARY KEY (parent_id, name)
+                )"""
+            )
+
+
+    def connect(self):
+        """Opens a connection to the cache database.
+
+        Returns:
+            sqlite3.Connection: The connection. Using it as a context manager commits the transaction.
+        """
+        return sqlite3.connect(self.path, timeout=30)
+
+
+    @staticmethod
+    def column_key(column_ids):
+        """Builds the key a snapshot of a set of columns is cached under.
+
+        Args:
+            column_ids (list): The IDs of the columns, or None for every column.
+
+        Returns:
+            str: The sorted column IDs joined by commas, or "*" for every column.
+        """
+        return "*" if column_ids is None else ",".join(str(column_id) for column_id in sorted(column_ids))
+
+
+    def load(self, sheet_id, column_ids=None):
+        """Loads the smallest cached snapshot of a sheet that contains the requested columns.
+
+        Args:
+            sheet_id (int): The ID of the sheet.
+            column_ids (list, optional): The IDs of the columns that are needed. Defaults to every column.
+
+        Returns:
+            dict: The cached snapshot of the sheet, or None if no snapshot of the sheet has those columns.
+        """
+        try:
+            with self.connect() as connection:
+                records = connection.execute(
+                    """SELECT column_key, version, synced_at, snapshots.column_ids, columns, rows, fingerprints.column_ids, hashes
+                    FROM snapshots LEFT JOIN fingerprints USING (sheet_id, column_key) WHERE sheet_id = ? ORDER BY size""",
+                    (sheet_id,),
+                ).fetchall()
+
+                # - A snapshot of more columns than were requested can be used as well
+                needed = None if column_ids is None else set(column_ids)
+                record = next((
+                    record for record in records
+                    if record[0] == "*" or (needed is not None and needed <= set(json.loads(record[3])))
+                ), None)
+                if record is None:
+                    return None
+
+                connection.execute(
+                    "UPDATE snapshots SET accessed_at = ? WHERE sheet_id = ? AND column_key = ?",
+                    (time.time(), sheet_id, record[0]),
+                )
+        except sqlite3.Error as e:
+            print(f"Could not read the snapshot cache: {e}")
+            return None
+
+        _, version, synced_at, column_ids, columns, rows, fingerprint_columns, hashes = record
+
+        # - JSON object keys are strings, so the row and column IDs are converted back to integers
+        return {
+            "version": version,
+            "synced_at": synced_at,
+            "column_ids": json.loads(column_ids),
+            "columns": json.loads(columns),
+            "rows": {
+                int(row_id): {int(column_id): value for column_id, value in cells.items()}
+                for row_id, cells in json.loads(rows).items()
+            },
+            "fingerprint_columns": json.loads(fingerprint_columns) if fingerprint_columns else None,
+            "fingerprints": {int(row_id): value for row_id, value in json.loads(hashes or "{}").items()},
+        }
+
+
+    def save(self, sheet_id, state):
+        """Saves the snapshot of a sheet, replacing the older snapshot of the same columns, and evicts snapshots if the cache is too large.
+
+        Args:
+            sheet_id (int): The ID of the sheet.
+            state (dict): The snapshot of the sheet.
+        """
+        column_key = self.column_key(state["column_ids"])
+        columns = json.dumps(state["columns"])
+        rows = json.dumps(state["rows"])
+        hashes = json.dumps(state.get("fingerprints") or {})
+
+        try:
+            with self.lock, self.connect() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        sheet_id,
+                        column_key,
+                        state["version"],
+                        state["synced_at"],
+                        json.dumps(state["column_ids"]),
+                        columns,
+                        rows,
+                        len(columns) + len(rows) + len(hashes),
+                        time.time(),
+                    ),
+                )
+                connection.execute(
+                    "INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?)",
+                    (sheet_id, column_key, json.dumps(state.get("fingerprint_columns")), hashes),
+                )
+                self.evict(connection)
+        except sqlite3.Error as e:
+            print(f"Could not write to the snapshot cache: {e}")
+
+
+    def save_fingerprints(self, sheet_id, column_ids, fingerprint_columns, fingerprints):
+        """Saves the row fingerprints of a cached snapshot without writing its rows again.
+
+        Args:
+            sheet_id (int): The ID of the sheet.
+            column_ids (list): The IDs of the columns of the snapshot, or None for every column.
+            fingerprint_columns (list): The IDs of the columns the fingerprints cover.
+            fingerprints (dict): The fingerprint of each row, keyed by row ID.
+        """
+        try:
+            with self.lock, self.connect() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?)",
+                    (sheet_id, self.column_key(column_ids), json.dumps(fingerprint_columns), json.dumps(fingerprints)),
+                )
+        except sqlite3.Error as e:
+            print(f"Could not write to the snapshot cache: {e}")
+
+
+    def load_columns(self, sheet_id):
+        """Loads the cached names and IDs of every column of a sheet.
+
+        Args:
+            sheet_id (int): The ID of the sheet.
+
+        Returns:
+            dict: The version of the sheet the columns were read at, and the names and IDs of the columns,
+                or None if the columns of the sheet are not cached.
+        """
+        try:
+            with self.connect() as connection:
+                record = connection.execute(
+                    "SELECT version, columns FROM sheet_columns WHERE sheet_id = ?", (sheet_id,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Could not read the snapshot cache: {e}")
+            return None
+
+        if record is None:
+            return None
+
+        return {"version": record[0], "columns": json.loads(record[1])}
+
+
+    def save_columns(self, sheet_id, version, columns):
+        """Saves the names and IDs of every column of a sheet.
+
+        Args:
+            sheet_id (int): The ID of the sheet.
+            version (int): The version of the sheet the columns were read at.
+            columns (dict): The names and IDs of the columns.
+        """
+        try:
+            with self.lock, self.connect() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO sheet_columns VALUES (?, ?, ?)", (sheet_id, version, json.dumps(columns))
+                )
+        except sqlite3.Error as e:
+            print(f"Could not write to the snapshot cache: {e}")
+
+
+    def evict(self, connection):
+        """Removes the least recently used snapshots until the cache fits in max_bytes.
+
+        Args:
+            connection (sqlite3.Connection): The open connection to the cache database.
+        """
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM snapshots").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        records = connection.execute("SELECT sheet_id, column_key, size FROM snapshots ORDER BY accessed_at").fetchall()
+        for sheet_id, column_key, size in records:
+            if total <= self.max_bytes:
+                break
+            connection.execute("DELETE FROM snapshots WHERE sheet_id = ? AND column_key = ?", (sheet_id, column_key))
+            connection.execute("DELETE FROM fingerprints WHERE sheet_id = ? AND column_key = ?", (sheet_id, column_key))
+            total -= size
+
+
+    def load_sheet_names(self, parent_id):
+        """Loads the cached names and IDs of the sheets in a folder or workspace.
+
+        Args:
+            parent_id (int): The ID of the folder or workspace.
+
+        Returns:
+            list: A list of dictionaries, where each dictionary contains the name and ID of a sheet, and the time it was fetched.
+        """
+        try:
+            with self.connect() as connection:
+                records = connection.execute(
+                    "SELECT name, sheet_id, fetched_at FROM sheet_names WHERE parent_id = ?", (parent_id,)
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Could not read the snapshot cache: {e}")
+            return []
+
+        return [{"name": name, "id": sheet_id, "fetched_at": fetched_at} for name, sheet_id, fetched_at in records]
+
+
+    def save_sheet_names(self, parent_id, sheets):
+        """Replaces the cached names and IDs of the sheets in a folder or workspace.
+
+        Args:
+            parent_id (int): The ID of the folder or workspace.
+            sheets (list): A list of dictionaries, where each dictionary contains the name and ID of a sheet.
+        """
+        fetched_at = time.time()
+        try:
+            with self.lock, self.connect() as connection:
+                connection.execute("DELETE FROM sheet_names WHERE parent_id = ?", (parent_id,))
+                connection.executemany(
+                    "INSERT OR REPLACE INTO sheet_names VALUES (?, ?, ?, ?)",
+                    [(parent_id, sheet["name"], sheet["id"], fetched_at) for sheet in sheets],
+                )
+        except sqlite3.Error as e:
+            print(f"Could not write to the snapshot cache: {e}")
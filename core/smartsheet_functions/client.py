@@ -1,7 +1,19 @@
+import threading
 from smartsheet import Smartsheet
+from ..config import settings
+from ..metrics import metrics
+from ..smartsheet_classes.request_scheduler import RequestScheduler
+
+# - One client per API key is shared by the whole process so its connection pool is reused
+clients = {}
+clients_lock = threading.Lock()
+
 
 def create_smartsheet_client(api_key):
-    """Creates a new Smartsheet client.
+    """Gets the shared Smartsheet client for an API key, creating it the first time it is needed.
+
+    The client keeps its connections alive between requests, so every SmartSheetApi object using the same
+    API key reuses the same connection pool instead of opening new connections.
 
     Args:
         api_key (str): The API key to use for authenticating the client.
@@ -9,8 +21,60 @@ def create_smartsheet_client(api_key):
     Returns:
         SmartsheetClient: The authenticated Smartsheet client.
     """
-    # - Set up the Smartsheet client
-    ss_client = Smartsheet(access_token = api_key)
-    ss_client.errors_as_exceptions(True)
+    with clients_lock:
+        ss_client = clients.get(api_key)
+
+        if ss_client is None:
+            # - Set up the Smartsheet client
+            # - Retries are handled by the RequestScheduler, so the SDK's own retry loop is turned off
+            # - Errors are returned instead of raised: the SDK fails with AttributeError when it raises a rate limit
+            # - or other retryable error, so the RequestScheduler raises them from the returned Error instead
+            ss_client = Smartsheet(
+                access_token = api_key,
+                max_connections = settings.MAX_CONNECTIONS,
+                max_retry_time = 0,
+                api_base = settings.SMARTSHEET_API_BASE
+            )
+            ss_client.errors_as_exceptions(False)
+
+            # - Ask for compressed responses, sheets are large JSON documents
+            session = getattr(ss_client, "_session", None)
+            if session is not None:
+                session.headers["Accept-Encoding"] = "gzip, deflate"
+
+                # - The SDK stores its response hook as a single function rather than a list, so it is
+                # - wrapped in a list before the byte counter is added after it
+                hooks = session.hooks.get("response") or []
+                if callable(hooks):
+                    hooks = [hooks]
+                session.hooks["response"] = list(hooks) + [count_bytes]
+
+            warm_smartsheet_client(ss_client, RequestScheduler(api_key, max_retries=0))
+            clients[api_key] = ss_client
+
+    return ss_client
+
 
-    return ss_client
\ No newline at end of file
+def count_bytes(response, *args, **kwargs):
+    """Counts the bytes sent and received by a request in the run metrics.
+
+    Args:
+        response (requests.Response): The response to the request.
+    """
+    body = response.request.body or b""
+    metrics.add("bytes_sent", len(body))
+    metrics.add("bytes_received", len(response.content))
+
+
+def warm_smartsheet_client(ss_client, scheduler):
+    """Opens a connection to the Smartsheet API ahead of the first real request.
+
+    Args:
+        ss_client (SmartsheetClient): The Smartsheet client to warm up.
+        scheduler (RequestScheduler): The scheduler the request is sent through, so it counts against the rate limit.
+    """
+    try:
+        # - Server info is a small request that does not need authentication
+        scheduler.call(ss_client.Server.server_info)
+    except Exception as e:
+        print(f"Could not warm up the Smartsheet client: {e}")
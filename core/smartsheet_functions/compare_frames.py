@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+from collections import namedtuple
+
+
+# - The columns of the changes table returned by compare_frames
+CHANGE_COLUMNS = ["key", "row_id", "column_id", "old_value", "new_value"]
+
+# - The operations needed to make a sheet match the Excel data, returned by plan_sync
+SyncPlan = namedtuple("SyncPlan", ["adds", "changes", "deletes", "unchanged"])
+
+# - Stands in for empty cells when hashing, so an empty cell and the text "None" hash differently
+EMPTY_CELL = "\x00"
+
+
+def normalize_values(frame):
+    """
+    Normalizes the values of a DataFrame so that values which mean the same thing compare as equal.
+
+    NaN, None and empty strings all become None, and numbers become floats, so 5 and 5.0 are the same value.
+    Strings are left as they are, so "5" is still different from 5.
+
+    Parameters:
+        frame (pd.DataFrame): The values to normalize.
+
+    Returns:
+        pd.DataFrame: The normalized values, with every column stored as objects.
+    """
+    normalized = frame.astype(object)
+    normalized = normalized.where(normalized.notna() & normalized.ne(""), None)
+
+    for column in normalized.columns:
+        values = normalized[column]
+        is_number = values.map(type).isin((int, float))
+        if is_number.any():
+            normalized[column] = values.where(~is_number, values[is_number].astype(float))
+
+    return normalized
+
+
+def unique_keys(excel_frame):
+    """
+    Drops the Excel rows without a key, and keeps the last row of each repeated key.
+
+    Parameters:
+        excel_frame (pd.DataFrame): The Excel data, indexed by the key column value.
+
+    Returns:
+        pd.DataFrame: The Excel data with one row for each key.
+    """
+    return excel_frame[excel_frame.index.notna() & ~excel_frame.index.duplicated(keep="last")]
+
+
+def hash_rows(normalized):
+    """
+    Hashes each row of a normalized DataFrame.
+
+    The columns are hashed in sorted order, so frames with the same columns in a different order give the same hashes.
+
+    Parameters:
+        normalized (pd.DataFrame): Values returned by normalize_values.
+
+    Returns:
+        pd.Series: The 64 bit hash of each row, with the same index as the frame.
+    """
+    values = normalized[sorted(normalized.columns)].fillna(EMPTY_CELL).astype(str)
+    return pd.util.hash_pandas_object(values, index=False)
+
+
+def fingerprint_rows(frame):
+    """
+    Works out a fingerprint of each row that only changes when a value in the row changes.
+
+    Values are normalized first, so rows that compare_frames would find equal have the same fingerprint.
+
+    Parameters:
+        frame (pd.DataFrame): The rows to fingerprint, with one column for each column ID.
+
+    Returns:
+        pd.Series: The fingerprint of each row, with the same index as the frame.
+    """
+    return hash_rows(normalize_values(frame))
+
+
+def compare_frames(excel_frame, sheet_frame, fingerprints=None):
+    """
+    Compares the Excel data with the Smartsheet data, row by key and all columns at once.
+
+    Both frames are indexed by the key column value. Only the keys and columns found in both frames are compared,
+    and if a key is repeated in the Excel data the last row wins. The rows are fingerprinted first, and only the
+    rows whose fingerprints differ are compared cell by cell.
+
+    Parameters:
+        excel_frame (pd.DataFrame): The Excel data, with one column for each column ID.
+        sheet_frame (pd.DataFrame): The Smartsheet data, with one column for each column ID and a "row" column with the row IDs.
+        fingerprints (dict, optional): The cached fingerprint of each Smartsheet row over the compared columns,
+            keyed by row ID. Defaults to fingerprinting the Smartsheet rows.
+
+    Returns:
+        pd.DataFrame: The changes table, with one row for each changed cell and the columns in CHANGE_COLUMNS.
+    """
+    excel_frame = unique_keys(excel_frame)
+
+    keys = excel_frame.index.intersection(sheet_frame.index)
+    columns = [column for column in excel_frame.columns if column in sheet_frame.columns and column != "row"]
+
+    new = normalize_values(excel_frame.loc[keys, columns])
+    row_ids = sheet_frame.loc[keys, "row"]
+
+    if fingerprints is None:
+        old_fingerprints = fingerprint_rows(sheet_frame.loc[keys, columns])
+    else:
+        old_fingerprints = row_ids.map(fingerprints)
+
+    # - Only the rows with a different fingerprint can have changed cells
+    changed_rows = hash_rows(new).to_numpy() != old_fingerprints.to_numpy()
+    keys = keys[changed_rows]
+    row_ids = row_ids[changed_rows]
+
+    old = normalize_values(sheet_frame.loc[keys, columns])
+    new = new.loc[keys]
+
+    # - None is not equal to None when comparing frames, so cells that are empty on both sides are matched separately
+    changed = ~((old == new) | (old.isna() & new.isna()))
+    rows, cols = np.nonzero(changed.to_numpy())
+
+    return pd.DataFrame({
+        "key": keys.to_numpy()[rows],
+        "row_id": row_ids.to_numpy()[rows],
+        "column_id": np.asarray(columns, dtype=object)[cols],
+        "old_value": old.to_numpy()[rows, cols],
+        "new_value": new.to_numpy()[rows, cols],
+    }, columns=CHANGE_COLUMNS)
+
+
+def plan_sync(excel_frame, sheet_frame, fingerprints=None):
+    """
+    Works out how to make the Smartsheet data match the Excel data, sorting every key into add, update, delete or unchanged.
+
+    Parameters:
+        excel_frame (pd.DataFrame): The Excel data, with one column for each column ID.
+        sheet_frame (pd.DataFrame): The Smartsheet data, with one column for each column ID and a "row" column with the row IDs.
+        fingerprints (dict, optional): The cached fingerprint of each Smartsheet row, passed on to compare_frames.
+
+    Returns:
+        SyncPlan: The Excel rows to add, the changes table of the rows to update, the IDs of the rows to delete,
+            and the number of rows that are unchanged.
+    """
+    excel_frame = unique_keys(excel_frame)
+
+    in_sheet = excel_frame.index.isin(sheet_frame.index)
+    in_excel = sheet_frame.index.isin(excel_frame.index)
+    changes = compare_frames(excel_frame, sheet_frame, fingerprints)
+
+    return SyncPlan(
+        adds=excel_frame[~in_sheet],
+        changes=changes,
+        deletes=sheet_frame.loc[~in_excel, "row"].tolist(),
+        unchanged=int(in_sheet.sum()) - changes["key"].nunique(),
+    )
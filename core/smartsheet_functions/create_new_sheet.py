@@ -9,7 +9,7 @@ def create_new_smartsheet(sheet_name):
         sheet_name (str): The name of the new smartsheet to be created.
 
     Returns:
-        None: This function does not return any value.
+        Sheet: The new sheet, or None if it could not be created.
     """
 
     try:
@@ -19,7 +19,7 @@ def create_new_smartsheet(sheet_name):
             workspace_id = int(settings.WORKSPACE_ID)
         )
                 
-        new_sheet.create_sheet_in_workspace(
+        return new_sheet.create_sheet_in_workspace(
             template_sheet_id = settings.TEMPLATE_SHEET,
             new_sheet_name = sheet_name, 
         )
@@ -1,10 +1,11 @@
 from ..config import settings
 from ..excel_classes.sheet_manager import ExcelSheetManager
+from ..excel_classes.workbook_cache import WorkbookCache
 from ..smartsheet_classes.smartsheet_api import SmartSheetApi
-from ..smartsheet_functions.update_data_in_smartsheet import update_smartsheet
+from ..smartsheet_functions.update_data_in_smartsheet import EXCEL_COLUMNS, IMPORT_OPTIONS, stream_smartsheet, update_smartsheet
 
 
-def import_excel_data(option, url, smartsheet_name):
+def import_excel_data(option, url, smartsheet_name, dry_run=False, progress=None):
     """
     Imports data from an Excel sheet into a Smartsheet.
 
@@ -19,24 +20,62 @@ def import_excel_data(option, url, smartsheet_name):
         the import process.
         url (str): a string containing the URL of the Excel sheet to import data from.
         smartsheet_name (str): a string containing the name of the Smartsheet to import data into.
+        dry_run (bool, optional): True to only report what an update would change, without changing the Smartsheet.
+        progress (Progress, optional): The progress that rows and batches are counted in, and that can cancel the
+        import between batches.
 
     Returns:
         None: This function does not return any value.
+
+    Raises:
+        OperationCancelled: If the progress is cancelled before the import finishes.
     """
 
     workspace = int(settings.WORKSPACE_ID)
 
     excel_data = ExcelSheetManager(
-        filebrowse_url=url, tab_name=settings.EXCEL_TAB, table_name=settings.TABLE_NAME
+        filebrowse_url=url,
+        tab_name=settings.EXCEL_TAB,
+        table_name=settings.TABLE_NAME,
+        columns=EXCEL_COLUMNS,
+        cache=WorkbookCache(),
     )
 
+    # - The workbook is opened before anything is asked of Smartsheet, and opening it checks the tab and its
+    # - header, so a wrong workbook fails straight away. Imports read it as a stream, updates parse it in full.
+    if option in IMPORT_OPTIONS:
+        excel_chunks = excel_data.stream_data(chunk_size=settings.BATCH_SIZE)
+        if isinstance(excel_chunks, list):
+            return excel_chunks
+    else:
+        excel_frame = excel_data.read_frame()
+        if isinstance(excel_frame, list):
+            return excel_frame
+        if isinstance(excel_frame, str):
+            return ["Incorrect Format"]
+
     sheet_manager = SmartSheetApi(
-        api_key=settings.API_KEY, sheet_name=smartsheet_name, workspace_id=workspace
+        api_key=settings.API_KEY, sheet_name=smartsheet_name, workspace_id=workspace, progress=progress
     )
 
-    excel_data_validation = excel_data.read_data()
-    if excel_data_validation[0] in ("Incorrect Tab Name", "Empty Tab"):
-        return excel_data_validation
+    if option in IMPORT_OPTIONS:
+        if not sheet_manager.get_sheet_id_by_name():
+            return ["Invalid ID"]
+
+        # - Imports into an empty sheet cannot duplicate its keys, so the rows are uploaded while the rest of the
+        # - workbook is still being read, and the stream stops if the workbook repeats one of its own keys
+        if option == "-IMPORT-" and sheet_manager.is_sheet_empty():
+            return stream_smartsheet(
+                excel_chunks=excel_chunks, sheet_manager=sheet_manager, option=option
+            )
+
+        # - Otherwise the duplicate check needs every row, which is read from the stream that is already open
+        excel_frame = excel_data.collect(excel_chunks)
+        if isinstance(excel_frame, list):
+            return excel_frame
+
+    sheet_manager.progress.add_rows(len(excel_frame))
+    sheet_manager.progress.check()
 
     sheet_id = sheet_manager.get_sheet_id_by_name()
 
@@ -44,7 +83,7 @@ def import_excel_data(option, url, smartsheet_name):
         return ["Invalid ID"]
 
     response = update_smartsheet(
-        excel_data=excel_data.read_data(), sheet_manager=sheet_manager, option=option
+        excel_data=excel_frame, sheet_manager=sheet_manager, option=option, dry_run=dry_run
     )
 
     return response
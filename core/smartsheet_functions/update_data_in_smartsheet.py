@@ -1,14 +1,163 @@
-import math
+import numbers
+import pandas as pd
+from ..smartsheet_classes.duplicate_index import DuplicateIndex
+from ..smartsheet_classes.progress import OperationCancelled
 
 
-def update_smartsheet(excel_data, sheet_manager, option):
+IMPORT_OPTIONS = ["-IMPORT-", "-IMPORT WITH DUPLICATES-"]
+
+# - The Excel column that identifies each row
+EXCEL_KEY_COLUMN = "Item ID"
+
+# - The Excel columns used by map_excel_frame, and the dtypes they are read as
+EXCEL_COLUMNS = {
+    "Item ID": object,
+    "Item Description": object,
+    "Quantity": object,
+    "UOM": object,
+    "Area": object,
+    "Specific Area": object,
+    "Awarded To": object,
+}
+
+
+# - The Smartsheet column each Excel column is mapped to, for imports and for updates
+IMPORT_COLUMN_MAP = {
+    "Item ID": "ITEM#",
+    "Item Description": "ITEM DESCRIPTION",
+    "Quantity": "QTY",
+    "UOM": "UOM",
+    "Area": "AREA",
+    "Specific Area": "NOTES",
+    "Awarded To": "AWARDED TO",
+}
+UPDATE_COLUMN_MAP = {
+    "Item ID": "ITEM#",
+    "Item Description": "ITEM DESCRIPTION",
+    "Quantity": "QTY",
+    "Area": "AREA",
+    "Specific Area": "NOTES",
+}
+
+
+def map_excel_frame(excel_frame, option):
+    """
+    Maps the columns of the Excel tab to the Smartsheet column names.
+
+    The columns are renamed and projected as a whole instead of row by row. Notes that are not text are replaced
+    with "" for imports and None for updates, and every other empty cell is replaced with None. Numeric quantities
+    are converted to floats, and text quantities are kept as they are.
+
+    Parameters:
+        excel_frame (pd.DataFrame): The Excel rows.
+        option (str): A string representing the update option, either one of the import options or anything else.
+
+    Returns:
+        pd.DataFrame: The rows with Smartsheet column names.
+
+    Raises:
+        KeyError: If a mapped column is missing from the Excel rows.
+    """
+    column_map = IMPORT_COLUMN_MAP if option in IMPORT_OPTIONS else UPDATE_COLUMN_MAP
+    mapped = excel_frame[list(column_map)].rename(columns=column_map).astype(object)
+    mapped = mapped.where(mapped.notna(), None)
+
+    notes = mapped["NOTES"]
+    mapped["NOTES"] = notes.where(notes.map(type).eq(str), "" if option in IMPORT_OPTIONS else None)
+
+    # - Quantities can be text such as "TBD", so only the numbers are converted to floats
+    quantities = mapped["QTY"]
+    is_number = quantities.map(lambda value: isinstance(value, numbers.Real) and not isinstance(value, bool))
+    mapped["QTY"] = quantities.where(~is_number, quantities[is_number].astype(float))
+    return mapped
+
+
+def map_excel_rows(excel_data, option):
+    """
+    Maps the rows of the Excel tab to the Smartsheet column names.
+
+    Parameters:
+        excel_data (List[Dict] or pd.DataFrame): The Excel rows.
+        option (str): A string representing the update option, either one of the import options or anything else.
+
+    Returns:
+        List[Dict]: A list of dictionaries of Smartsheet column names and values.
+    """
+    return map_excel_frame(pd.DataFrame(excel_data), option).to_dict("records")
+
+
+def stream_smartsheet(excel_chunks, sheet_manager, option):
+    """
+    Imports a stream of Excel chunks into an empty smartsheet, sending each batch while the next chunk is being read.
+
+    The Item IDs of each chunk are checked against every Item ID read before it, and the stream stops at the first
+    chunk that repeats one, so none of its rows are sent. Imports with duplicates mark every row of a repeated
+    Item ID, including rows that would already have been sent, so they are not streamed.
+
+    Parameters:
+        excel_chunks (Generator[List[Dict]]): A generator of chunks of Excel rows.
+        sheet_manager (Object): An object representing the smartsheet to import the data into. The sheet must be empty.
+        option (str): "-IMPORT-".
+
+    Returns:
+        str: A message indicating if the data was successfully inserted.
+        list: An error key and details if the tab was empty, an Item ID was repeated, a value could not be read,
+            or a batch failed to write. ["Partial Write", details] if rows had already been added when the
+            import stopped.
+    """
+    column_dict = sheet_manager.get_columns()
+    row_count = 0
+    seen = set()
+    repeated = set()
+
+    def new_rows():
+        nonlocal row_count
+        for chunk in excel_chunks:
+            chunk_repeated, chunk_keys = DuplicateIndex.repeated(row[EXCEL_KEY_COLUMN] for row in chunk)
+            repeated.update(chunk_repeated | (chunk_keys & seen))
+            if repeated:
+                return
+            seen.update(chunk_keys)
+
+            sheet_manager.progress.add_rows(len(chunk))
+            for mapped_column in map_excel_rows(chunk, option):
+                row_count += 1
+                yield sheet_manager.build_new_row(mapped_column, column_dict)
+
+    try:
+        added_excel_data = sheet_manager.write_new_rows(new_rows())
+    except (KeyError, ValueError):
+        # - The sheet was empty, so any rows in it now were added before the value that could not be read
+        sheet_manager.invalidate_snapshot()
+        rows_written = sheet_manager.get_row_count()
+        if rows_written:
+            return ["Partial Write", [f"{rows_written} rows were added before a value could not be read"]]
+        return ["Incorrect Format"]
+
+    if added_excel_data != "Success":
+        return added_excel_data
+
+    if repeated:
+        keys = sorted(str(key) for key in repeated)
+        if row_count:
+            return ["Partial Write", [f"{row_count} rows were added before a repeated Item ID was read: {', '.join(keys)}"]]
+        return ["Duplicates Found", keys]
+
+    if row_count == 0:
+        return ["Empty Tab"]
+
+    return "Data inserted successfully!"
+
+
+def update_smartsheet(excel_data, sheet_manager, option, dry_run=False):
     """
     Updates data in a smartsheet based on an option.
 
     Parameters:
-        excel_data (List[Dict]): A list of dictionaries containing the data to be updated.
+        excel_data (pd.DataFrame or List[Dict]): The Excel rows to be updated.
         sheet_manager (Object): An object representing the smartsheet to update the data in.
         option (str): A string representing the update option, either "-IMPORT-" or anything else.
+        dry_run (bool, optional): True to only report the rows an update would add, update and delete.
 
     Returns:
         str: A message indicating if the data was successfully updated or if duplicates were found.
@@ -16,67 +165,56 @@ def update_smartsheet(excel_data, sheet_manager, option):
     Raises:
     Exception: If there's an error updating the data in the smartsheet, an error message will be displayed.
     """
-    mapped_columns = None
     column_dict = sheet_manager.get_columns()
-    if option in ["-IMPORT-", "-IMPORT WITH DUPLICATES-"]:
-        mapped_columns = [
-            {
-                "ITEM#": row["Item ID"],
-                "ITEM DESCRIPTION": row["Item Description"],
-                "QTY": row["Quantity"],
-                "UOM": row["UOM"],
-                "AREA": row["Area"],
-                "NOTES": row["Specific Area"] if isinstance(row["Specific Area"], str) else "",
-                "AWARDED TO": row["Awarded To"],
-            }
-            for row in excel_data
-        ]
-    else:
-        mapped_columns = [
-            {
-                "ITEM#": row["Item ID"],
-                "ITEM DESCRIPTION": row["Item Description"],
-                "QTY": row["Quantity"],
-                "AREA": row["Area"],
-                "NOTES": row["Specific Area"]
-                if isinstance(row["Specific Area"], str)
-                else None,
-            }
-            for row in excel_data
-        ]
+    mapped_frame = map_excel_frame(pd.DataFrame(excel_data), option)
 
     try:
-        common_keys = set(mapped_columns[0].keys()) & set(column_dict.keys())
-        dictionary_of_keys = {key: column_dict[key] for key in common_keys}
+        dictionary_of_keys = {key: column_dict[key] for key in mapped_frame.columns if key in column_dict}
         sheet_manager.key_column_id = dictionary_of_keys["ITEM#"]
-        new_dict = {
-            row["ITEM#"]: {dictionary_of_keys[k]: v for k, v in row.items()}
-            for row in mapped_columns
-        }
+        sheet_manager.data_column_ids = list(dictionary_of_keys.values())
+
+        if option in IMPORT_OPTIONS:
+            excel_keys = mapped_frame["ITEM#"].tolist()
+            mapped_columns = mapped_frame.to_dict("records")
 
         if option == "-IMPORT-":
             added_excel_data = sheet_manager.add_rows(
                 mapped_columns=mapped_columns,
                 column_dict=column_dict,
-                compare_dict_keys=new_dict,
+                excel_keys=excel_keys,
                 allowed=False,
             )
             return (
                 added_excel_data
-                if added_excel_data[0] == "Duplicates Found"
+                if added_excel_data != "Success"
                 else "Data inserted successfully!"
             )
         elif option == "-IMPORT WITH DUPLICATES-":
             added_excel_data = sheet_manager.add_rows(
                 mapped_columns=mapped_columns,
                 column_dict=column_dict,
-                compare_dict_keys=new_dict,
+                excel_keys=excel_keys,
                 allowed=True,
             )
+            if added_excel_data != "Success":
+                return added_excel_data
 
             return (added_excel_data,"Data inserted successfully!")
         else:
-            compared_data = sheet_manager.update_data(excel_data=new_dict)
+            # - The payload is keyed by column ID, so it is built from the renamed frame in one pass
+            id_frame = mapped_frame[list(dictionary_of_keys)].rename(columns=dictionary_of_keys)
+            id_frame.index = mapped_frame["ITEM#"]
+
+            # - Rows that the update adds are filled like an import, including the columns that are not compared
+            import_frame = map_excel_frame(pd.DataFrame(excel_data), IMPORT_OPTIONS[0])
+            import_keys = {key: column_dict[key] for key in import_frame.columns if key in column_dict}
+            new_rows = import_frame[list(import_keys)].rename(columns=import_keys)
+            new_rows.index = import_frame["ITEM#"]
+
+            compared_data = sheet_manager.update_data(excel_data=id_frame, dry_run=dry_run, new_rows=new_rows)
             return compared_data
+    except OperationCancelled:
+        # - A cancelled run is reported by the caller, not as a formatting error
+        raise
     except Exception as e:
         return ["Incorrect Format"]
@@ -27,14 +27,14 @@ Author:
 """
 
 
-from core.gui.create_smartsheet_window import create_new_smartsheet_window
-from core.gui.import_sheet_window import import_sheet_window
-from core.smartsheet_functions.import_excel_data import import_excel_data
 import PySimpleGUI as sg
 import traceback
 import sys
 import os
 
+# - The windows and the functions they run are imported the first time they are needed, so pandas, openpyxl
+# - and the Smartsheet SDK are not loaded before the main window appears
+
 
 def resource_path(relative_path):
     """Get absolute path to resource, works for dev and for PyInstaller"""
@@ -47,6 +47,13 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 
+def run_import(*args, **kwargs):
+    """Runs import_excel_data, importing it the first time it runs on the import window's background thread."""
+    from core.smartsheet_functions.import_excel_data import import_excel_data
+
+    return import_excel_data(*args, **kwargs)
+
+
 def main():
     """
     Initializes and displays the main GUI window. Defines the layout for the GUI and creates the event loop that waits for user input.
@@ -152,26 +159,34 @@ def main():
 
             # display the 'Create Sheet' window if the user clicks the 'Create Sheet' button
             elif event == "-NEW-":
+                from core.gui.create_smartsheet_window import create_new_smartsheet_window
+
                 window.hide()
                 create_new_smartsheet_window()
                 window.un_hide()
 
             # display the 'Import Data' window if the user clicks the 'Import Data' button
             elif event == "-IMPORT-":
+                from core.gui.import_sheet_window import import_sheet_window
+
                 window.hide()
-                import_sheet_window("Import", import_excel_data, event)
+                import_sheet_window("Import", run_import, event)
                 window.un_hide()
 
             # display the 'Import Data' window if the user clicks the 'Import Data' button
             elif event == "-IMPORT WITH DUPLICATES-":
+                from core.gui.import_sheet_window import import_sheet_window
+
                 window.hide()
-                import_sheet_window("Import With Duplicates", import_excel_data, event)
+                import_sheet_window("Import With Duplicates", run_import, event)
                 window.un_hide()
 
             # display the 'Update Sheet' window if the user clicks the 'Update Sheet' button
             elif event == "-UPDATE-":
+                from core.gui.import_sheet_window import import_sheet_window
+
                 window.hide()
-                import_sheet_window("Update", import_excel_data, event)
+                import_sheet_window("Update", run_import, event)
                 window.un_hide()
 
         # close the main GUI window
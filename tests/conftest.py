@@ -0,0 +1,50 @@
+import pytest
+from benchmarks.fake_smartsheet_server import FakeSmartsheet, start_server
+from benchmarks.generate_workbook import write_workbook
+from core.config import settings
+from core.smartsheet_classes.request_scheduler import RequestScheduler
+from core.smartsheet_classes.sheet_name_index import SheetNameIndex
+from core.smartsheet_functions import client
+
+
+@pytest.fixture
+def fake_smartsheet(monkeypatch, tmp_path):
+    """A fake Smartsheet server with a workspace and a template sheet, with the settings pointed at it."""
+    fake = FakeSmartsheet()
+    workspace_id = fake.create_workspace()
+    template = fake.create_sheet("Purchasing Template", workspace_id)
+    server, base_url = start_server(fake)
+
+    for name, value in {
+        "SMARTSHEET_API_BASE": base_url,
+        "API_KEY": "test-key",
+        "WORKSPACE_ID": str(workspace_id),
+        "TEMPLATE_SHEET": str(template["id"]),
+        "EXCEL_TAB": "Purchasing_Items",
+        "TABLE_NAME": "Purchasing_Items",
+        "CACHE_DIR": str(tmp_path / "cache"),
+        "RATE_LIMIT": 100_000,
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+
+    # - Clients, rate limits and sheet name indexes are shared by the process, so each test starts without them
+    monkeypatch.setattr(client, "clients", {})
+    monkeypatch.setattr(RequestScheduler, "buckets", {})
+    monkeypatch.setattr(SheetNameIndex, "indexes", {})
+
+    fake.workspace_id = workspace_id
+    yield fake
+    server.shutdown()
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    """Writes a Purchasing_Items workbook from a list of rows and returns its path."""
+    count = 0
+
+    def write(rows):
+        nonlocal count
+        count += 1
+        return write_workbook(str(tmp_path / f"workbook_{count}.xlsx"), rows)
+
+    return write
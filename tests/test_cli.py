@@ -0,0 +1,31 @@
+from core.cli import run_manifest
+from core.smartsheet_functions.create_new_sheet import create_new_smartsheet
+from core.smartsheet_functions.import_excel_data import import_excel_data
+
+
+def row(item_id, quantity=1.0):
+    return [item_id, "Conduit", quantity, "EA", "Roof", None, "Acme Supply"]
+
+
+def test_update_jobs_use_the_prefetched_sheets(fake_smartsheet, workbook):
+    sheet_ids = []
+    for name in ("North", "South"):
+        sheet_ids.append(create_new_smartsheet(name).id)
+        assert import_excel_data("-IMPORT-", workbook([row("A-1"), row("A-2")]), name) == "Data inserted successfully!"
+
+    update = workbook([row("A-1", 5.0), row("A-2")])
+    fake_smartsheet.log.clear()
+
+    summary = run_manifest([
+        {"workbook": update, "sheet": "North", "operation": "update"},
+        {"workbook": update, "sheet": "South", "operation": "update"},
+    ])
+
+    assert summary["counts"]["succeeded"] == 2
+    for sheet_id in sheet_ids:
+        columns = {column["title"]: column["id"] for column in fake_smartsheet.sheets[sheet_id]["columns"]}
+        compared = ",".join(str(columns[title]) for title in ("ITEM#", "ITEM DESCRIPTION", "QTY", "AREA", "NOTES"))
+        downloads = [query for method, path, query in fake_smartsheet.log if method == "GET" and path == f"/sheets/{sheet_id}"]
+        # - Only the compared columns are downloaded, once by the prefetch, and the job only checks the version
+        assert downloads == [{"columnIds": compared}]
+        assert ("GET", f"/sheets/{sheet_id}/version", {}) in fake_smartsheet.log
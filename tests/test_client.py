@@ -0,0 +1,24 @@
+from benchmarks.fake_smartsheet_server import FakeSmartsheet, start_server
+from core.metrics import metrics
+from core.smartsheet_functions import client
+
+
+def test_create_smartsheet_client(monkeypatch):
+    server, base_url = start_server(FakeSmartsheet())
+    monkeypatch.setattr(client.settings, "SMARTSHEET_API_BASE", base_url)
+    monkeypatch.setattr(client, "clients", {})
+    metrics.reset()
+
+    try:
+        ss_client = client.create_smartsheet_client("test-key")
+
+        # - The SDK's own hook is kept and the byte counter runs after it
+        hooks = ss_client._session.hooks["response"]
+        assert len(hooks) == 2 and hooks[-1] is client.count_bytes
+
+        # - The warm up request went to the fake server and was counted
+        assert metrics.counters["bytes_received"] > 0
+
+        assert client.create_smartsheet_client("test-key") is ss_client
+    finally:
+        server.shutdown()
@@ -0,0 +1,164 @@
+import openpyxl
+import pytest
+from benchmarks.generate_workbook import COLUMNS
+from core.config import settings
+from core.smartsheet_classes.smartsheet_api import SmartSheetApi
+from core.smartsheet_functions.create_new_sheet import create_new_smartsheet
+from core.smartsheet_functions.import_excel_data import import_excel_data
+from core.smartsheet_functions.update_data_in_smartsheet import stream_smartsheet
+
+
+def row(item_id, quantity=1.0, description="Conduit"):
+    return [item_id, description, quantity, "EA", "Roof", None, "Acme Supply"]
+
+
+def sheet_gets(fake, sheet_id):
+    """The queries of every GET /sheets/{id} request."""
+    return [query for method, path, query in fake.log if method == "GET" and path == f"/sheets/{sheet_id}"]
+
+
+def test_update_only_downloads_the_compared_columns(fake_smartsheet, workbook):
+    sheet = create_new_smartsheet("Project")
+    assert import_excel_data("-IMPORT-", workbook([row("A-1"), row("A-2")]), "Project") == "Data inserted successfully!"
+
+    fake_smartsheet.log.clear()
+    result = import_excel_data("-UPDATE-", workbook([row("A-1", 5.0), row("A-2")]), "Project")
+
+    assert result == ["Update successful."]
+    assert all("columnIds" in query or "pageSize" in query for query in sheet_gets(fake_smartsheet, sheet.id))
+
+
+def sheet_values(fake, sheet_id, title):
+    """The values of one column of a fake sheet, in row order."""
+    sheet = fake.sheets[sheet_id]
+    column_id = next(column["id"] for column in sheet["columns"] if column["title"] == title)
+    return [row["cells"].get(column_id) for row in sheet["rows"].values()]
+
+
+def test_import_into_empty_sheet_refuses_repeated_keys(fake_smartsheet, workbook):
+    sheet = create_new_smartsheet("Project")
+
+    result = import_excel_data("-IMPORT-", workbook([row("A-1"), row("A-2"), row("A-1")]), "Project")
+
+    assert result == ["Duplicates Found", ["A-1"]]
+    assert fake_smartsheet.sheets[sheet.id]["rows"] == {}
+
+
+def test_import_with_duplicates_into_empty_sheet_marks_repeated_keys(fake_smartsheet, workbook):
+    sheet = create_new_smartsheet("Project")
+
+    result = import_excel_data("-IMPORT WITH DUPLICATES-", workbook([row("A-1"), row("A-2"), row("A-1")]), "Project")
+
+    assert result == ("Success", "Data inserted successfully!")
+    assert sheet_values(fake_smartsheet, sheet.id, "ITEM#") == ["A-1 - duplicate", "A-2", "A-1 - duplicate"]
+
+    # - The duplicate rows are highlighted with an update after they are added
+    assert any(method == "PUT" and path == f"/sheets/{sheet.id}/rows" for method, path, query in fake_smartsheet.log)
+
+
+def test_stream_smartsheet_reports_partial_write(fake_smartsheet, monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_SIZE", 2)
+    sheet = create_new_smartsheet("Project")
+    sheet_manager = SmartSheetApi(api_key=settings.API_KEY, sheet_name="Project", workspace_id=fake_smartsheet.workspace_id)
+    sheet_manager.get_sheet_id_by_name()
+
+    def chunks():
+        yield [dict(zip(COLUMNS, row(f"A-{number}"))) for number in range(4)]
+        raise ValueError("could not convert string to float: 'lots'")
+
+    result = stream_smartsheet(chunks(), sheet_manager, "-IMPORT-")
+
+    assert result == ["Partial Write", ["4 rows were added before a value could not be read"]]
+    assert len(fake_smartsheet.sheets[sheet.id]["rows"]) == 4
+
+
+@pytest.mark.parametrize("option", ["-IMPORT-", "-UPDATE-"])
+def test_missing_columns_are_reported_before_any_request(fake_smartsheet, tmp_path, option):
+    workbook = openpyxl.Workbook()
+    workbook.active.title = "Purchasing_Items"
+    workbook.active.append([column for column in COLUMNS if column != "UOM"])
+    workbook.active.append(["A-1", "Conduit", 1.0, "Roof", None, "Acme Supply"])
+    workbook.save(tmp_path / "missing_uom.xlsx")
+    fake_smartsheet.log.clear()
+
+    result = import_excel_data(option, str(tmp_path / "missing_uom.xlsx"), "Project")
+
+    assert result == ["Missing Columns", ["UOM"]]
+    assert fake_smartsheet.log == []
+
+
+def test_text_quantities_are_imported_and_updated(fake_smartsheet, workbook):
+    sheet = create_new_smartsheet("Project")
+
+    result = import_excel_data("-IMPORT-", workbook([row("A-1", quantity="TBD"), row("A-2", quantity=3)]), "Project")
+    assert result == "Data inserted successfully!"
+    assert sheet_values(fake_smartsheet, sheet.id, "QTY") == ["TBD", 3.0]
+
+    result = import_excel_data("-UPDATE-", workbook([row("A-1", quantity=2), row("A-2", quantity="TBD")]), "Project")
+    assert result == ["Update successful."]
+    assert sheet_values(fake_smartsheet, sheet.id, "QTY") == [2.0, "TBD"]
+
+
+def test_update_fills_every_column_of_added_rows(fake_smartsheet, workbook):
+    sheet = create_new_smartsheet("Project")
+    assert import_excel_data("-IMPORT-", workbook([row("A-1")]), "Project") == "Data inserted successfully!"
+
+    result = import_excel_data("-UPDATE-", workbook([row("A-1"), row("A-2")]), "Project")
+
+    assert result == ["Update successful."]
+    assert sheet_values(fake_smartsheet, sheet.id, "ITEM#") == ["A-1", "A-2"]
+    assert sheet_values(fake_smartsheet, sheet.id, "UOM") == ["EA", "EA"]
+    assert sheet_values(fake_smartsheet, sheet.id, "AWARDED TO") == ["Acme Supply", "Acme Supply"]
+
+
+def test_update_keeps_marked_duplicates(fake_smartsheet, workbook):
+    sheet = create_new_smartsheet("Project")
+    result = import_excel_data("-IMPORT WITH DUPLICATES-", workbook([row("A-1"), row("A-2"), row("A-1"), row("A-3")]), "Project")
+    assert result == ("Success", "Data inserted successfully!")
+
+    result = import_excel_data("-UPDATE-", workbook([row("A-2")]), "Project")
+
+    assert result == ["Update successful."]
+    assert sheet_values(fake_smartsheet, sheet.id, "ITEM#") == ["A-1 - duplicate", "A-2", "A-1 - duplicate"]
+
+
+def test_import_stops_at_the_chunk_that_repeats_a_key(fake_smartsheet, workbook, monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_SIZE", 2)
+    sheet = create_new_smartsheet("Project")
+
+    rows = [row("A-1"), row("A-2"), row("A-3"), row("A-4"), row("A-5"), row("A-1")]
+    result = import_excel_data("-IMPORT-", workbook(rows), "Project")
+
+    assert result == ["Partial Write", ["4 rows were added before a repeated Item ID was read: A-1"]]
+    assert sheet_values(fake_smartsheet, sheet.id, "ITEM#") == ["A-1", "A-2", "A-3", "A-4"]
+
+
+def test_imports_open_the_workbook_once(fake_smartsheet, workbook, monkeypatch):
+    create_new_smartsheet("Project")
+    paths = [workbook([row("A-1"), row("A-2")]), workbook([row("A-2"), row("A-3")])]
+    opened = []
+    load_workbook = openpyxl.load_workbook
+
+    def counting_load_workbook(*args, **kwargs):
+        opened.append(args[0])
+        return load_workbook(*args, **kwargs)
+
+    monkeypatch.setattr(openpyxl, "load_workbook", counting_load_workbook)
+
+    # - The first import is streamed into the empty sheet, the second is read in full to find duplicates
+    assert import_excel_data("-IMPORT-", paths[0], "Project") == "Data inserted successfully!"
+    assert import_excel_data("-IMPORT WITH DUPLICATES-", paths[1], "Project") == ("Success", "Data inserted successfully!")
+
+    assert len(opened) == 2
+
+
+def test_update_opens_the_workbook_once(fake_smartsheet, workbook, monkeypatch):
+    create_new_smartsheet("Project")
+    assert import_excel_data("-IMPORT-", workbook([row("A-1")]), "Project") == "Data inserted successfully!"
+    path = workbook([row("A-1", 5.0)])
+    opened = []
+    load_workbook = openpyxl.load_workbook
+    monkeypatch.setattr(openpyxl, "load_workbook", lambda *args, **kwargs: opened.append(args[0]) or load_workbook(*args, **kwargs))
+
+    assert import_excel_data("-UPDATE-", path, "Project") == ["Update successful."]
+    assert len(opened) == 1
@@ -0,0 +1,36 @@
+import pytest
+from smartsheet.exceptions import ApiError
+from core.config import settings
+from core.smartsheet_classes.request_scheduler import RequestScheduler
+from core.smartsheet_functions.client import create_smartsheet_client
+
+
+def test_call_retries_a_rate_limited_request(fake_smartsheet):
+    ss_client = create_smartsheet_client(settings.API_KEY)
+    scheduler = RequestScheduler(settings.API_KEY, base_delay=0.01)
+    fake_smartsheet.retry_after = 0
+    fake_smartsheet.throttle_next = 2
+
+    workspace = scheduler.call(ss_client.Workspaces.get_workspace, fake_smartsheet.workspace_id, load_all=False)
+
+    assert workspace.name == "Benchmarks"
+    assert fake_smartsheet.throttled == 2
+    assert scheduler.summary()["retries"] == 2
+
+
+def test_call_raises_errors_that_are_not_retried(fake_smartsheet):
+    ss_client = create_smartsheet_client(settings.API_KEY)
+    scheduler = RequestScheduler(settings.API_KEY, base_delay=0.01)
+
+    with pytest.raises(ApiError) as raised:
+        scheduler.call(ss_client.Sheets.get_sheet, 1)
+
+    assert raised.value.error.result.status_code == 404
+    assert scheduler.summary()["retries"] == 0
+
+
+def test_client_warm_up_goes_through_the_rate_limit(fake_smartsheet):
+    create_smartsheet_client(settings.API_KEY)
+
+    bucket = RequestScheduler.buckets[settings.API_KEY]
+    assert bucket.tokens < bucket.capacity
@@ -0,0 +1,16 @@
+import random
+from benchmarks.run_benchmarks import make_workbooks, run_size
+
+
+def test_benchmark_finishes_when_requests_are_throttled(fake_smartsheet, tmp_path):
+    fake_smartsheet.throttle = 0.3
+    fake_smartsheet.random = random.Random(3)
+    fake_smartsheet.retry_after = 0
+
+    results = run_size(100, make_workbooks(100, str(tmp_path)))
+
+    assert fake_smartsheet.throttled > 0
+    assert sum(result["counters"].get("retries", 0) for result in results.values()) > 0
+    assert results["import/100"]["response"] == "Data inserted successfully!"
+    assert results["update/100"]["response"] == "['Update successful.']"
+    assert results["import_with_duplicates/100"]["response"] == "('Success', 'Data inserted successfully!')"
@@ -0,0 +1,19 @@
+from benchmarks.fake_smartsheet_server import TEMPLATE_COLUMNS
+from core.config import settings
+from core.smartsheet_classes.smartsheet_api import SmartSheetApi
+
+
+def test_highlight_duplicates_only_formats_the_mapped_columns(fake_smartsheet):
+    sheet = fake_smartsheet.create_sheet("Wide", fake_smartsheet.workspace_id, TEMPLATE_COLUMNS + ["COMMENTS", "ORDERED"])
+    columns = {column["title"]: column["id"] for column in sheet["columns"]}
+    for row_id in (1, 2):
+        sheet["rows"][row_id] = {"id": row_id, "cells": {columns["ITEM#"]: "A-1"}, "modifiedAt": sheet["modifiedAt"]}
+
+    api = SmartSheetApi(api_key=settings.API_KEY, sheet_id=sheet["id"])
+    highlighted = []
+    build_partial_row = api.build_partial_row
+    api.build_partial_row = lambda row_id, cell_values: highlighted.append(set(cell_values)) or build_partial_row(row_id, cell_values)
+
+    api.highlight_duplicates([1, 2])
+
+    assert highlighted == [{columns[title] for title in TEMPLATE_COLUMNS}] * 2
@@ -0,0 +1,60 @@
+from core.config import settings
+from core.smartsheet_classes.sheet_snapshot import SheetSnapshot
+from core.smartsheet_classes.smartsheet_api import SmartSheetApi
+from core.smartsheet_classes.snapshot_cache import SnapshotCache
+from core.smartsheet_functions.create_new_sheet import create_new_smartsheet
+
+
+def state(column_ids, rows):
+    return {
+        "version": 1,
+        "synced_at": None,
+        "column_ids": column_ids,
+        "columns": {f"Column {column_id}": column_id for column_id in column_ids},
+        "rows": rows,
+    }
+
+
+def test_snapshots_of_different_columns_are_kept_apart(tmp_path):
+    store = SnapshotCache(str(tmp_path / "snapshots.sqlite3"))
+    store.save(1, state([11, 12], {100: {11: "A-1", 12: 5}}))
+    store.save(1, state([13], {100: {13: "Roof"}}))
+
+    assert store.load(1, [12, 11])["rows"] == {100: {11: "A-1", 12: 5}}
+    assert store.load(1, [13])["rows"] == {100: {13: "Roof"}}
+    # - A snapshot of more columns is used for fewer columns, but not for every column
+    assert store.load(1, [11])["column_ids"] == [11, 12]
+    assert store.load(1) is None
+
+
+def test_fingerprints_are_saved_without_the_rows(tmp_path, monkeypatch):
+    store = SnapshotCache(str(tmp_path / "snapshots.sqlite3"))
+    store.save(1, state([11, 12], {100: {11: "A-1", 12: 5}, 101: {11: "A-2", 12: 1}}))
+
+    snapshot = SheetSnapshot(None, None, 1, [11, 12], store).sync(version=1)
+    saved = []
+    monkeypatch.setattr(store, "save", lambda *args: saved.append(args))
+    fingerprints = snapshot.row_fingerprints([11, 12])
+
+    assert saved == []
+
+    cached = store.load(1, [11, 12])
+    assert cached["fingerprint_columns"] == [11, 12]
+    assert cached["fingerprints"] == fingerprints
+
+
+def test_columns_are_read_from_the_cache_until_the_sheet_changes(fake_smartsheet):
+    sheet_id = create_new_smartsheet("North").id
+    columns_path = f"/sheets/{sheet_id}/columns"
+
+    def column_fetches():
+        api = SmartSheetApi(api_key=settings.API_KEY, sheet_id=sheet_id)
+        columns = api.get_columns()
+        return columns, sum(path == columns_path for method, path, query in fake_smartsheet.log)
+
+    columns, fetches = column_fetches()
+    assert fetches == 1
+    assert column_fetches() == (columns, 1)
+
+    fake_smartsheet.touch(fake_smartsheet.sheets[sheet_id])
+    assert column_fetches() == (columns, 2)
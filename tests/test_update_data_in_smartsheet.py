@@ -0,0 +1,24 @@
+import pandas as pd
+import pytest
+from core.smartsheet_classes.progress import OperationCancelled
+from core.smartsheet_functions.update_data_in_smartsheet import update_smartsheet
+
+
+class CancelledSheet:
+    """A sheet whose update is cancelled before its first batch."""
+
+    def get_columns(self):
+        return {"ITEM#": 1, "ITEM DESCRIPTION": 2, "QTY": 3, "AREA": 4, "NOTES": 5}
+
+    def update_data(self, excel_data, dry_run=False, new_rows=None):
+        raise OperationCancelled("Cancelled after 0 batches were sent.")
+
+
+def test_update_smartsheet_reraises_cancellation():
+    excel_frame = pd.DataFrame([{
+        "Item ID": "A-1", "Item Description": "Conduit", "Quantity": 2.0, "UOM": "EA",
+        "Area": "Roof", "Specific Area": None, "Awarded To": None,
+    }])
+
+    with pytest.raises(OperationCancelled):
+        update_smartsheet(excel_frame, CancelledSheet(), "-UPDATE-")